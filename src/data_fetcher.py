@@ -7,46 +7,25 @@ import fastf1
 import pandas as pd
 import os
 import json
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import redis
 
+from redis_cache import get_cache_instance, TTL_POLICY
 
-class RedisCache:
-    """Custom cache backend for FastF1 using Redis"""
-    
-    def __init__(self, redis_host=None, redis_port=None, redis_db=None):
-        """Initialize Redis cache"""
-        self.redis_client = redis.Redis(
-            host=redis_host or os.getenv('REDIS_HOST', 'localhost'),
-            port=int(redis_port or os.getenv('REDIS_PORT', 6379)),
-            db=int(redis_db or os.getenv('REDIS_DB', 0)),
-            decode_responses=False  # We need bytes for pickle
-        )
-    
-    def get(self, key):
-        """Get cached data from Redis"""
-        try:
-            data = self.redis_client.get(key)
-            if data:
-                return pickle.loads(data)
-            return None
-        except Exception as e:
-            print(f"Redis get error: {e}")
-            return None
+# Sessions downloaded concurrently by cache_historical_data
+SESSION_FETCH_WORKERS = 8
+
+
+def _session_ttl(session, key_class='session'):
+    """Cache TTL for data from a loaded session
     
-    def set(self, key, value, ttl=None):
-        """Set cached data in Redis"""
-        try:
-            serialized = pickle.dumps(value)
-            if ttl:
-                self.redis_client.setex(key, ttl, serialized)
-            else:
-                self.redis_client.set(key, serialized)
-            return True
-        except Exception as e:
-            print(f"Redis set error: {e}")
-            return False
+    Recent sessions expire quickly so later timing corrections get picked
+    up; older ones use the TTL_POLICY entry of `key_class`.
+    """
+    session_date = getattr(session, 'date', None)
+    recent = (session_date is not None and
+              pd.Timestamp(session_date) > pd.Timestamp.now() - pd.Timedelta(days=3))
+    return TTL_POLICY['session_recent'] if recent else TTL_POLICY[key_class]
 
 
 class F1DataFetcher:
@@ -63,7 +42,7 @@ class F1DataFetcher:
         """
         self.use_redis = use_redis
         if self.use_redis:
-            self.redis_cache = RedisCache(redis_host, redis_port, redis_db)
+            self.redis_cache = get_cache_instance(redis_host, redis_port, redis_db)
             print(f"✓ Redis cache enabled")
         else:
             self.redis_cache = None
@@ -87,7 +66,7 @@ class F1DataFetcher:
             
             # Cache in Redis
             if self.use_redis:
-                self.redis_cache.set(cache_key, schedule, ttl=86400)  # 24 hours
+                self.redis_cache.set(cache_key, schedule)
             
             return schedule
         except Exception as e:
@@ -116,13 +95,50 @@ class F1DataFetcher:
             
             # Cache in Redis
             if self.use_redis:
-                self.redis_cache.set(cache_key, session, ttl=86400)  # 24 hours
+                self.redis_cache.set(cache_key, session, ttl=_session_ttl(session))
             
             return session
         except Exception as e:
             print(f"Error fetching session {year} {event} {session_type}: {e}")
             return None
     
+    def fetch_session_results(self, year, event, session_type='R'):
+        """Fetch only the results table of a session
+        
+        Cached on its own as Parquet (KBs), so callers that only need the
+        classification skip deserializing the full session with its laps
+        and telemetry.
+        """
+        cache_key = f"results:{year}:{event}:{session_type}"
+        if self.use_redis:
+            results = self.redis_cache.get_dataframe(cache_key)
+            if results is not None:
+                return results
+        
+        session = self.fetch_session_data(year, event, session_type)
+        if session is None or session.results is None:
+            return None
+        results = pd.DataFrame(session.results)
+        if self.use_redis:
+            self.redis_cache.cache_dataframe(cache_key, results, ttl=_session_ttl(session, 'results'))
+        return results
+    
+    def prefetch_session_results(self, year, events, session_types=('Q', 'R')):
+        """Look up many cached results tables with one MGET
+        
+        Returns:
+            dict of (event, session_type) -> results DataFrame for the cache hits only
+        """
+        if not self.use_redis:
+            return {}
+        pairs = [(event, session_type) for event in events for session_type in session_types]
+        frames = self.redis_cache.mget_dataframes([
+            f"results:{year}:{event}:{session_type}" for event, session_type in pairs
+        ])
+        cached = {pair: results for pair, results in zip(pairs, frames) if results is not None}
+        print(f"✓ Prefetched {len(cached)}/{len(pairs)} {year} session results from Redis cache")
+        return cached
+    
     def fetch_race_results(self, year, event):
         """Fetch race results for a specific event"""
         try:
@@ -203,23 +219,18 @@ class F1DataFetcher:
             if schedule is None:
                 continue
             
-            # Fetch race weekends
-            for idx, event in schedule.iterrows():
-                event_name = event['EventName']
-                print(f"\nProcessing: {event_name}")
-                
-                # Fetch different session types
-                for session_type in ['Q', 'R']:
-                    try:
-                        self.fetch_session_data(year, event_name, session_type)
-                    except Exception as e:
-                        print(f"  Skipping {session_type}: {e}")
-                
-                # Try to fetch sprint if available
-                try:
-                    self.fetch_session_data(year, event_name, 'S')
-                except:
-                    pass
+            # Qualifying, race and (if held) sprint of every race weekend; the
+            # downloads are network-bound, so overlap them across the season
+            # (fetch_session_data reports and swallows its own errors, e.g. no sprint)
+            jobs = [
+                (event_name, session_type)
+                for event_name in schedule['EventName']
+                for session_type in ('Q', 'R', 'S')
+            ]
+            with ThreadPoolExecutor(max_workers=SESSION_FETCH_WORKERS) as executor:
+                list(executor.map(
+                    lambda job: self.fetch_session_data(year, *job), jobs
+                ))
         
         print(f"\n✓ Caching complete! Data stored in Redis")
 
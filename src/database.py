@@ -5,16 +5,269 @@ Manages F1 data storage in PostgreSQL database
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import pandas as pd
 import os
-from datetime import datetime
-import json
+import io
+import csv
+import queue
+import threading
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import quote
+
+import orjson
+
+from redis_cache import get_cache_instance, make_key
+
+
+# Append-only list of schema migrations. Entry N upgrades the schema from
+# version N to N + 1; never edit or reorder existing entries, only append.
+SCHEMA_MIGRATIONS = [
+    # 1: prediction outputs added after the initial release
+    [
+        'ALTER TABLE predictions ADD COLUMN IF NOT EXISTS predicted_time REAL',
+        'ALTER TABLE predictions ADD COLUMN IF NOT EXISTS top10_probability REAL',
+        'ALTER TABLE predictions ADD COLUMN IF NOT EXISTS shap_values_json TEXT',
+    ],
+    # 2: store prediction features / SHAP values as JSONB. Legacy rows were
+    # written by json.dumps, which emits NaN / Infinity that JSONB rejects:
+    # those become null, and text that still does not parse becomes NULL.
+    # The ::text casts keep this valid on fresh installs, whose columns are
+    # already JSONB.
+    [
+        """
+        CREATE OR REPLACE FUNCTION f1_text_to_jsonb(value TEXT) RETURNS JSONB
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            RETURN value::jsonb;
+        EXCEPTION WHEN others THEN
+            BEGIN
+                RETURN regexp_replace(value, '-?\\m(NaN|Infinity)\\M', 'null', 'g')::jsonb;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+        END
+        $$
+        """,
+        'ALTER TABLE predictions ALTER COLUMN features_json TYPE JSONB '
+        'USING f1_text_to_jsonb(features_json::text)',
+        'ALTER TABLE predictions ALTER COLUMN shap_values_json TYPE JSONB '
+        'USING f1_text_to_jsonb(shap_values_json::text)',
+        'DROP FUNCTION f1_text_to_jsonb(TEXT)',
+    ],
+    # 3: pre-sorted races for get_all_races, refreshed after race writes
+    [
+        'CREATE MATERIALIZED VIEW IF NOT EXISTS mv_races_sorted AS '
+        'SELECT * FROM races ORDER BY year DESC, round_number',
+        # A unique index is required for REFRESH ... CONCURRENTLY
+        'CREATE UNIQUE INDEX IF NOT EXISTS mv_races_sorted_race_id ON mv_races_sorted (race_id)',
+        'CREATE INDEX IF NOT EXISTS mv_races_sorted_order ON mv_races_sorted (year DESC, round_number)',
+        'CREATE INDEX IF NOT EXISTS idx_predictions_race_session ON predictions (race_id, session_type)',
+    ],
+    # 4: indexes on the race_id foreign keys and getter filter columns
+    [
+        'CREATE INDEX IF NOT EXISTS idx_race_results_race ON race_results (race_id, position)',
+        'CREATE INDEX IF NOT EXISTS idx_qualifying_results_race ON qualifying_results (race_id)',
+        'CREATE INDEX IF NOT EXISTS idx_sprint_results_race ON sprint_results (race_id)',
+        'CREATE INDEX IF NOT EXISTS idx_aggregated_laps_race_session '
+        'ON aggregated_laps (race_id, session_type, driver_number)',
+        'CREATE INDEX IF NOT EXISTS idx_tyre_stats_race_session '
+        'ON tyre_stats (race_id, session_type, driver_number)',
+    ],
+    # 5: definitions of indexes dropped by without_indexes() until they are rebuilt
+    [
+        'CREATE TABLE IF NOT EXISTS dropped_indexes ('
+        'index_name TEXT PRIMARY KEY, table_name TEXT NOT NULL, definition TEXT NOT NULL)',
+    ],
+]
+
+# Return JSONB columns as their JSON text so readers keep the same
+# features_json / shap_values_json strings as before the JSONB migration
+psycopg2.extras.register_default_jsonb(loads=lambda value: value, globally=True)
+
+
+def _dumps_json(value):
+    """Serialize a features / SHAP dict to JSON text (numpy scalars allowed)"""
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _to_seconds(value):
+    """Normalize a lap/sector time (Timedelta, timedelta64 or number) to float seconds"""
+    if value is None or pd.isna(value):
+        return None
+    if isinstance(value, timedelta):  # includes pd.Timedelta
+        return value.total_seconds()
+    if getattr(value, 'dtype', None) is not None and value.dtype.kind == 'm':
+        return pd.Timedelta(value).total_seconds()
+    return float(value)
+
+
+# Background writer: max queued rows and max rows committed per transaction
+WRITE_QUEUE_SIZE = 10_000
+WRITE_BATCH_SIZE = 1000
+# Statements joined per round-trip by psycopg2.extras.execute_batch
+EXECUTE_BATCH_PAGE_SIZE = 500
+# Result batches at least this large are loaded with COPY instead of INSERT
+COPY_MIN_ROWS = 100
+
+# Default TTL (seconds) for cached query results
+QUERY_CACHE_TTL = 3600
+
+# Per-process connection pool bounds
+POOL_MIN_CONN = int(os.getenv('POSTGRES_POOL_MIN', 1))
+POOL_MAX_CONN = int(os.getenv('POSTGRES_POOL_MAX', 10))
+
+# Connection pools shared by every F1Database in this process, keyed by db_config
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _reset_pools_after_fork():
+    """Forget pools inherited from the parent process
+    
+    The inherited sockets belong to the parent's sessions, so they are
+    dropped without closing; the child opens fresh connections on demand.
+    """
+    global _POOLS_LOCK
+    _POOLS.clear()
+    _POOLS_LOCK = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+def _get_pool(db_config):
+    """Return this process's connection pool for db_config, creating it once"""
+    key = tuple(sorted(db_config.items()))
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = psycopg2.pool.ThreadedConnectionPool(POOL_MIN_CONN, POOL_MAX_CONN, **db_config)
+                _POOLS[key] = pool
+    return pool
+
+
+# Read-only getter SQL, built once at import
+GET_ALL_RACES_SQL = "SELECT * FROM mv_races_sorted ORDER BY year DESC, round_number"
+# Same rows straight from races, for databases without mv_races_sorted
+GET_ALL_RACES_FALLBACK_SQL = "SELECT * FROM races ORDER BY year DESC, round_number"
+RACES_VIEW_EXISTS_SQL = "SELECT to_regclass('mv_races_sorted') IS NOT NULL AS present"
+GET_RACE_IDS_SQL = "SELECT event_name, race_id FROM races WHERE year = %s"
+GET_RACE_RESULTS_SQL = "SELECT * FROM race_results WHERE race_id = %s ORDER BY position"
+# get_predictions variants keyed by (race_id given, session_type given)
+GET_PREDICTIONS_SQL = {
+    (False, False): "SELECT * FROM predictions ORDER BY predicted_position",
+    (True, False): "SELECT * FROM predictions WHERE race_id = %s ORDER BY predicted_position",
+    (False, True): "SELECT * FROM predictions WHERE session_type = %s ORDER BY predicted_position",
+    (True, True): (
+        "SELECT * FROM predictions WHERE race_id = %s AND session_type = %s "
+        "ORDER BY predicted_position"
+    ),
+}
+
+
+@lru_cache(maxsize=256)
+def _normalize_sql(query):
+    """Collapse whitespace so equivalent SQL strings share a cache key"""
+    return ' '.join(query.split())
+
+
+@lru_cache(maxsize=1024)
+def _query_cache_key(table, version, query, params_repr):
+    """Cache key from the table's cache version, the normalized SQL and its bind parameters"""
+    return make_key(f"query:{table}:v{version}", _normalize_sql(query), params_repr)
+
+
+# Column orders for COPY bulk loads
+PREDICTION_COLUMNS = [
+    'race_id', 'session_type', 'driver_number', 'predicted_position', 'predicted_time',
+    'confidence', 'top10_probability', 'model_type', 'prediction_date',
+    'features_json', 'shap_values_json'
+]
+AGGREGATED_LAP_COLUMNS = [
+    'race_id', 'session_type', 'driver_number', 'lap_number', 'lap_time',
+    'sector1_time', 'sector2_time', 'sector3_time', 'compound', 'tyre_life',
+    'track_status', 'is_personal_best'
+]
+INTEGER_COLUMNS = {
+    'race_id', 'driver_number', 'predicted_position', 'lap_number', 'tyre_life',
+    'is_personal_best', 'position', 'grid_position'
+}
+
+
+def _to_int(value):
+    """Native int (psycopg2 cannot adapt numpy integers), keeping None"""
+    return int(value) if value is not None else None
+
+
+QUALIFYING_RESULT_COLUMNS = [
+    'race_id', 'driver_number', 'position', 'q1_time', 'q2_time', 'q3_time'
+]
+RACE_RESULT_COLUMNS = [
+    'race_id', 'driver_number', 'position', 'points', 'grid_position', 'status',
+    'fastest_lap_time'
+]
+INSERT_QUALIFYING_RESULTS_SQL = """
+    INSERT INTO qualifying_results 
+        (race_id, driver_number, position, q1_time, q2_time, q3_time)
+    VALUES %s
+"""
+INSERT_RACE_RESULTS_SQL = """
+    INSERT INTO race_results 
+        (race_id, driver_number, position, points, grid_position, status, fastest_lap_time)
+    VALUES %s
+"""
+
+
+def _copy_rows(cursor, table, columns, rows):
+    """Stream row tuples into `table` with COPY FROM STDIN (CSV, \\N for NULL)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerows(
+        tuple('\\N' if value is None else value for value in row) for row in rows
+    )
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')", buf
+    )
+
+
+def _qualifying_rows(rows):
+    """Normalize (race_id, driver_number, position, q1, q2, q3) tuples for psycopg2"""
+    return [
+        (_to_int(race_id), _to_int(driver_number), _to_int(position), str(q1), str(q2), str(q3))
+        for race_id, driver_number, position, q1, q2, q3 in rows
+    ]
+
+
+def _race_result_rows(rows):
+    """Normalize (race_id, driver_number, position, points, grid_position,
+    status, fastest_lap) tuples for psycopg2"""
+    return [
+        (_to_int(race_id), _to_int(driver_number), _to_int(position),
+         float(points) if points is not None else None, _to_int(grid_position),
+         status, str(fastest_lap))
+        for race_id, driver_number, position, points, grid_position, status, fastest_lap in rows
+    ]
+
+
+def _dedupe_rows(rows, key_columns):
+    """Keep the last row per conflict key (ON CONFLICT DO UPDATE rejects repeats)"""
+    unique = {}
+    for row in rows:
+        unique[tuple(row[i] for i in key_columns)] = row
+    return list(unique.values())
 
 
 class F1Database:
     """Manages PostgreSQL database for F1 data"""
     
-    def __init__(self, db_config=None):
+    def __init__(self, db_config=None, initialize=True, background_writes=False, use_cache=False):
         """Initialize database connection
         
         Args:
@@ -24,6 +277,17 @@ class F1Database:
                 - database: Database name (default: f1_data)
                 - user: Database user (default: postgres)
                 - password: Database password (default: postgres)
+            initialize: Create tables and run migrations on construction.
+                Pass False for short-lived readers of an already
+                initialized database to skip the DDL round-trips.
+            background_writes: Queue fire-and-forget inserts (drivers, teams,
+                results, predictions, laps, tyre stats) to a writer thread
+                that commits them in batches. Call flush() before reading
+                back data written this way. Writes made inside
+                transaction() are never queued; they join the transaction.
+            use_cache: Cache getter results in Redis, keyed on the SQL text
+                and bind parameters. Entries are invalidated per table on
+                writes made through this class.
         """
         if db_config is None:
             db_config = {
@@ -34,24 +298,206 @@ class F1Database:
                 'password': os.getenv('POSTGRES_PASSWORD', 'hdemus')
             }
         self.db_config = db_config
-        self.conn = None
-        self.initialize_database()
+        self._pool = None
+        # Set once mv_races_sorted is known to exist (schema migration 3)
+        self._races_view = False
+        # Per-thread state: transaction() (connection, tables written) and connect()'s connection
+        self._local = threading.local()
+        self.cache = get_cache_instance() if use_cache else None
+        if initialize:
+            self.initialize_database()
+        
+        self._write_q = None
+        if background_writes:
+            self._write_q = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+            writer = threading.Thread(target=self._writer_loop, name='f1db-writer', daemon=True)
+            writer.start()
     
     def connect(self):
-        """Create database connection"""
-        self.conn = psycopg2.connect(**self.db_config)
+        """Check out a database connection from the process-wide pool into self.conn
+        
+        Legacy single-threaded API for callers that manage the connection
+        themselves (pair with close()). Methods of this class never touch
+        self.conn; they borrow their own connection via pooled_connection(),
+        so one instance can be shared between threads.
+        """
+        self._pool = _get_pool(self.db_config)
+        self.conn = self._pool.getconn()
         return self.conn
     
+    @property
+    def conn(self):
+        """Connection checked out by connect() on the calling thread, or None"""
+        return getattr(self._local, 'conn', None)
+    
+    @conn.setter
+    def conn(self, value):
+        self._local.conn = value
+    
+    @contextmanager
+    def pooled_connection(self):
+        """Borrow a pooled connection independently of self.conn
+        
+        Safe to use from worker threads; the connection goes back to the
+        pool (open transactions rolled back) when the block exits.
+        """
+        pool = _get_pool(self.db_config)
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            pool.putconn(conn)
+    
+    def _transaction_state(self):
+        """(connection, tables written) of this thread's open transaction(), or None"""
+        return getattr(self._local, 'tx', None)
+    
+    @contextmanager
+    def transaction(self):
+        """Group this thread's writes inside the block into one transaction
+        
+        Writes made through this class (including those that would otherwise
+        go to the background writer) and reads via _fetch_df share one
+        pooled connection, committed once when the block exits and rolled
+        back if it raises. A failed write only rolls back to its own
+        savepoint, like outside a transaction.
+        Nested blocks join the outer transaction.
+        """
+        if self._transaction_state() is not None:
+            yield self._transaction_state()[0]
+            return
+        pool = _get_pool(self.db_config)
+        conn = pool.getconn()
+        tables = set()
+        self._local.tx = (conn, tables)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.tx = None
+            pool.putconn(conn)
+        # Only now are the writes visible to other connections and the cache
+        for table in tables:
+            self._invalidate(table)
+        if 'races' in tables:
+            self.refresh_races_view()
+    
+    @contextmanager
+    def _write_connection(self, *tables):
+        """Connection for one write, committed and its tables invalidated on success
+        
+        Inside transaction() the write runs on the transaction's connection
+        under a savepoint instead, and commit/invalidation wait for the
+        transaction to end.
+        """
+        state = self._transaction_state()
+        if state is not None:
+            conn, pending = state
+            cursor = conn.cursor()
+            cursor.execute('SAVEPOINT f1db_write')
+            try:
+                yield conn
+            except Exception:
+                cursor.execute('ROLLBACK TO SAVEPOINT f1db_write')
+                raise
+            cursor.execute('RELEASE SAVEPOINT f1db_write')
+            pending.update(tables)
+            return
+        with self.pooled_connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        for table in tables:
+            self._invalidate(table)
+    
     def close(self):
-        """Close database connection"""
+        """Return the connection checked out by connect() to the pool (open transactions are rolled back)"""
         if self.conn:
-            self.conn.close()
+            # After a fork the pool that lent this connection no longer exists here
+            if _POOLS.get(tuple(sorted(self.db_config.items()))) is self._pool:
+                self._pool.putconn(self.conn)
+            self.conn = None
+    
+    def _write(self, table, sql, params, label):
+        """Execute a single-row write, or hand it to the background writer"""
+        # Queued rows would commit on the writer's own connection, outside transaction()
+        if self._write_q is not None and self._transaction_state() is None:
+            self._write_q.put((table, sql, params, label))
+            return
+        try:
+            with self._write_connection(table) as conn:
+                conn.cursor().execute(sql, params)
+        except Exception as e:
+            print(f"Error inserting {label}: {e}")
+    
+    def _writer_loop(self):
+        """Drain the write queue, committing up to WRITE_BATCH_SIZE rows at a time"""
+        conn = None
+        while True:
+            batch = [self._write_q.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                if conn is None or conn.closed:
+                    conn = psycopg2.connect(**self.db_config)
+                self._write_batch(conn, batch)
+            except Exception as e:
+                print(f"Error writing batch of {len(batch)} rows: {e}")
+            finally:
+                for _ in batch:
+                    self._write_q.task_done()
+    
+    def _write_batch(self, conn, batch):
+        """Write queued rows grouped by statement in one transaction"""
+        grouped = {}
+        for table, sql, params, label in batch:
+            grouped.setdefault((sql, label), []).append(params)
+        cursor = conn.cursor()
+        try:
+            for (sql, label), rows in grouped.items():
+                # cursor.executemany() would do one round-trip per row
+                psycopg2.extras.execute_batch(cursor, sql, rows, page_size=EXECUTE_BATCH_PAGE_SIZE)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            # Retry row by row so a single bad row does not drop the batch
+            for table, sql, params, label in batch:
+                try:
+                    cursor.execute(sql, params)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Error inserting {label}: {e}")
+        for table in {item[0] for item in batch}:
+            self._invalidate(table)
+    
+    def flush(self):
+        """Block until all queued background writes are done"""
+        if self._write_q is not None:
+            self._write_q.join()
     
     def initialize_database(self):
         """Create database tables if they don't exist"""
-        conn = self.connect()
-        cursor = conn.cursor()
+        with self.pooled_connection() as conn:
+            self._create_tables(conn.cursor())
+            conn.commit()
+        print(f"✓ Database initialized: {self.db_config['database']} on {self.db_config['host']}")
         
+        # Run migrations
+        self.upgrade_database()
+        self.restore_indexes()
+    
+    def _create_tables(self, cursor):
+        """Run the CREATE TABLE IF NOT EXISTS statements of the base schema"""
         # Drivers table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS drivers (
@@ -144,13 +590,13 @@ class F1Database:
                 top10_probability REAL,
                 model_type TEXT,
                 prediction_date TEXT,
-                features_json TEXT,
-                shap_values_json TEXT,
+                features_json JSONB,
+                shap_values_json JSONB,
                 FOREIGN KEY (race_id) REFERENCES races(race_id)
             )
         ''')
         
-        # Aggregated laps table
+        # Aggregated laps table (times are seconds; REAL is a 4-byte float in PostgreSQL)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS aggregated_laps (
                 lap_id SERIAL PRIMARY KEY,
@@ -202,286 +648,635 @@ class F1Database:
             )
         ''')
         
-        conn.commit()
-        self.close()
-        print(f"✓ Database initialized: {self.db_config['database']} on {self.db_config['host']}")
-        
-        # Run migrations
-        self.upgrade_database()
+        # Schema version table (single row) used by upgrade_database
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO schema_version (version)
+            SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM schema_version)
+        ''')
     
     def upgrade_database(self):
-        """Upgrade existing database schema with new columns"""
-        conn = self.connect()
-        cursor = conn.cursor()
+        """Apply pending schema migrations based on the stored schema version
+        
+        Each migration is committed together with its version bump, so a
+        failure keeps the versions before it applied. The failing migration
+        is rolled back and its error re-raised.
+        """
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            version = None
+            while True:
+                try:
+                    # Row lock serializes concurrent upgrades from parallel processes
+                    cursor.execute('SELECT version FROM schema_version FOR UPDATE')
+                    version = cursor.fetchone()[0]
+                    if version >= len(SCHEMA_MIGRATIONS):
+                        conn.commit()
+                        return
+                    for statement in SCHEMA_MIGRATIONS[version]:
+                        cursor.execute(statement)
+                    cursor.execute('UPDATE schema_version SET version = %s', (version + 1,))
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"Error upgrading schema from version {version}: {e}")
+                    raise
+                print(f"✓ Upgraded schema from version {version} to {version + 1}")
+    
+    def _execute_values(self, table, sql, rows, label, fetch=False):
+        """Run a multi-row INSERT ... VALUES %s for all rows in one transaction"""
+        if not rows:
+            return []
         try:
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'predictions'
-            """)
-            columns = [col[0] for col in cursor.fetchall()]
-
-            if 'predicted_time' not in columns:
-                cursor.execute('ALTER TABLE predictions ADD COLUMN predicted_time REAL')
-                print("✓ Added predicted_time column to predictions table")
-            if 'top10_probability' not in columns:
-                cursor.execute('ALTER TABLE predictions ADD COLUMN top10_probability REAL')
-                print("✓ Added top10_probability column to predictions table")
-            if 'shap_values_json' not in columns:
-                cursor.execute('ALTER TABLE predictions ADD COLUMN shap_values_json TEXT')
-                print("✓ Added shap_values_json column to predictions table")
-
-            conn.commit()
+            with self._write_connection(table) as conn:
+                return psycopg2.extras.execute_values(
+                    conn.cursor(), sql, rows, page_size=WRITE_BATCH_SIZE, fetch=fetch
+                )
         except Exception as e:
-            print(f"Migration note: {e}")
-        finally:
-            self.close()
+            print(f"Error inserting {label}: {e}")
+            return None
     
-    def insert_driver(self, driver_number, abbreviation, full_name, team_name, year):
-        """Insert driver information (upsert on (driver_number, year))"""
-        conn = self.connect()
-        cursor = conn.cursor()
+    def _copy_dataframe(self, table, df, label):
+        """Bulk load a DataFrame into `table` with COPY FROM STDIN (CSV)"""
+        if len(df) == 0:
+            return 0
+        # COPY parses integer columns strictly, so "3.0" or "True" would be rejected
+        int_cols = [c for c in df.columns if c in INTEGER_COLUMNS and df[c].dtype.kind in 'fbO']
+        if int_cols:
+            df = df.assign(**{c: df[c].astype('float64').round().astype('Int64') for c in int_cols})
+        buf = io.StringIO()
+        df.to_csv(buf, header=False, index=False)
+        buf.seek(0)
+        
         try:
-            cursor.execute("""
-                INSERT INTO drivers (driver_number, abbreviation, full_name, team_name, year)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (driver_number, year)
-                DO UPDATE SET
-                    abbreviation = EXCLUDED.abbreviation,
-                    full_name = EXCLUDED.full_name,
-                    team_name = EXCLUDED.team_name
-            """, (driver_number, abbreviation, full_name, team_name, year))
-            conn.commit()
+            with self._write_connection(table) as conn:
+                conn.cursor().copy_expert(
+                    f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT CSV)", buf
+                )
+            return len(df)
         except Exception as e:
-            print(f"Error inserting driver: {e}")
-        finally:
-            self.close()
+            print(f"Error copying {label}: {e}")
+            return 0
+    
+    def copy_predictions(self, df):
+        """Bulk load predictions with COPY
+        
+        Args:
+            df: DataFrame with columns from PREDICTION_COLUMNS. Dict columns
+                `features` / `shap_values` are serialized into features_json /
+                shap_values_json, and prediction_date defaults to now.
+        
+        Returns:
+            Number of rows loaded
+        """
+        if 'features' in df.columns:
+            df = df.assign(features_json=df['features'].map(_dumps_json))
+        if 'shap_values' in df.columns:
+            df = df.assign(shap_values_json=df['shap_values'].map(
+                lambda v: _dumps_json(v) if v else None
+            ))
+        if 'prediction_date' not in df.columns:
+            df = df.assign(prediction_date=datetime.now().isoformat())
+        columns = [c for c in PREDICTION_COLUMNS if c in df.columns]
+        return self._copy_dataframe('predictions', df[columns], 'predictions')
+    
+    def copy_aggregated_laps(self, df):
+        """Bulk load aggregated laps with COPY
+        
+        Args:
+            df: DataFrame with columns from AGGREGATED_LAP_COLUMNS; lap and
+                sector times may be seconds or Timedelta
+        
+        Returns:
+            Number of rows loaded
+        """
+        columns = [c for c in AGGREGATED_LAP_COLUMNS if c in df.columns]
+        df = df[columns]
+        time_cols = [c for c in ('lap_time', 'sector1_time', 'sector2_time', 'sector3_time')
+                     if c in df.columns and df[c].dtype.kind == 'm']
+        if time_cols:
+            df = df.assign(**{c: df[c].dt.total_seconds() for c in time_cols})
+        return self._copy_dataframe('aggregated_laps', df, 'aggregated laps')
+    
+    def insert_driver(self, driver_number, abbreviation, full_name, team_name, year):
+        """Insert driver information (upsert on (driver_number, year))"""
+        self._write('drivers', """
+            INSERT INTO drivers (driver_number, abbreviation, full_name, team_name, year)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (driver_number, year)
+            DO UPDATE SET
+                abbreviation = EXCLUDED.abbreviation,
+                full_name = EXCLUDED.full_name,
+                team_name = EXCLUDED.team_name
+        """, (driver_number, abbreviation, full_name, team_name, year), 'driver')
+    
+    def insert_drivers(self, rows):
+        """Bulk upsert drivers in a single statement
+        
+        Args:
+            rows: Sequence of (driver_number, abbreviation, full_name, team_name, year)
+        """
+        rows = _dedupe_rows(rows, (0, 4))
+        self._execute_values('drivers', """
+            INSERT INTO drivers (driver_number, abbreviation, full_name, team_name, year)
+            VALUES %s
+            ON CONFLICT (driver_number, year)
+            DO UPDATE SET
+                abbreviation = EXCLUDED.abbreviation,
+                full_name = EXCLUDED.full_name,
+                team_name = EXCLUDED.team_name
+        """, rows, 'drivers')
     
     def insert_team(self, team_name, year):
         """Insert team information (ignore duplicates on (team_name, year))"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO teams (team_name, year)
-                VALUES (%s, %s)
-                ON CONFLICT (team_name, year) DO NOTHING
-            """, (team_name, year))
-            conn.commit()
-        except Exception as e:
-            print(f"Error inserting team: {e}")
-        finally:
-            self.close()
+        self._write('teams', """
+            INSERT INTO teams (team_name, year)
+            VALUES (%s, %s)
+            ON CONFLICT (team_name, year) DO NOTHING
+        """, (team_name, year), 'team')
+    
+    def insert_teams(self, rows):
+        """Bulk insert teams, ignoring duplicates
+        
+        Args:
+            rows: Sequence of (team_name, year)
+        """
+        self._execute_values('teams', """
+            INSERT INTO teams (team_name, year)
+            VALUES %s
+            ON CONFLICT (team_name, year) DO NOTHING
+        """, _dedupe_rows(rows, (0, 1)), 'teams')
     
     def insert_race(self, year, round_number, event_name, country, location, event_date):
         """Insert race information (upsert on (year, round_number)) and return race_id"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
+        race_ids = self.insert_races([(year, round_number, event_name, country, location, event_date)])
+        return race_ids[0] if race_ids else None
+    
+    def insert_races(self, rows):
+        """Bulk upsert races in a single statement
+        
+        Args:
+            rows: Sequence of (year, round_number, event_name, country, location, event_date)
+        
+        Returns:
+            List of race_ids aligned with rows, or None on error
+        """
+        rows = [tuple(row[:5]) + (str(row[5]),) for row in rows]
+        result = self._execute_values('races', """
+            INSERT INTO races (year, round_number, event_name, country, location, event_date)
+            VALUES %s
+            ON CONFLICT (year, round_number)
+            DO UPDATE SET
+                event_name = EXCLUDED.event_name,
+                country = EXCLUDED.country,
+                location = EXCLUDED.location,
+                event_date = EXCLUDED.event_date
+            RETURNING year, round_number, race_id
+        """, _dedupe_rows(rows, (0, 1)), 'races', fetch=True)
+        if result is None:
+            return None
+        # Inside transaction() the view is refreshed when the transaction commits
+        if self._transaction_state() is None:
+            self.refresh_races_view()
+        race_id_by_key = {(year, round_number): race_id for year, round_number, race_id in result}
+        return [race_id_by_key.get((row[0], row[1])) for row in rows]
+    
+    def _races_view_exists(self):
+        """Whether mv_races_sorted exists (checked until it does, then remembered)"""
+        if not self._races_view:
+            self._races_view = bool(self._fetch_df(RACES_VIEW_EXISTS_SQL)['present'].iloc[0])
+        return self._races_view
+    
+    @contextmanager
+    def without_indexes(self, *tables):
+        """Drop the secondary indexes of tables for a bulk load, rebuilding them afterwards
+        
+        Primary key and unique indexes stay, since ON CONFLICT targets and
+        integrity checks need them. The dropped indexes are recreated from
+        their saved definitions with CREATE INDEX CONCURRENTLY when the block
+        exits, even if it raises. The definitions are also stored in the
+        dropped_indexes table, so restore_indexes() (run on initialization)
+        rebuilds them if the process dies before the block exits.
+        """
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO races (year, round_number, event_name, country, location, event_date)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (year, round_number)
-                DO UPDATE SET
-                    event_name = EXCLUDED.event_name,
-                    country = EXCLUDED.country,
-                    location = EXCLUDED.location,
-                    event_date = EXCLUDED.event_date
-                RETURNING race_id
-            """, (year, round_number, event_name, country, location, str(event_date)))
-            race_id = cursor.fetchone()[0]
+                SELECT i.relname, t.relname, pg_get_indexdef(ix.indexrelid)
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_class t ON t.oid = ix.indrelid
+                JOIN pg_namespace n ON n.oid = t.relnamespace
+                WHERE n.nspname = 'public' AND t.relname = ANY(%s)
+                  AND NOT ix.indisprimary AND NOT ix.indisunique
+            """, (list(tables),))
+            rows = cursor.fetchall()
+            # Saved in the same transaction as the drops, so no definition is ever lost
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO dropped_indexes (index_name, table_name, definition) VALUES %s
+                ON CONFLICT (index_name) DO UPDATE SET definition = EXCLUDED.definition
+            """, rows)
+            for name, _, _ in rows:
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
             conn.commit()
-            return race_id
-        except Exception as e:
-            print(f"Error inserting race: {e}")
-            return None
+        indexes = [(name, definition) for name, _, definition in rows]
+        try:
+            yield
         finally:
-            self.close()
+            self._rebuild_indexes(indexes)
+            print(f"✓ Rebuilt {len(indexes)} indexes on {', '.join(tables)}")
+    
+    def _rebuild_indexes(self, indexes):
+        """Recreate (name, definition) indexes concurrently and forget their saved definitions
+        
+        A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind;
+        it is dropped again, its definition kept for the next attempt, and
+        the error re-raised.
+        """
+        with self.pooled_connection() as conn:
+            # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+            conn.autocommit = True
+            try:
+                cursor = conn.cursor()
+                for name, definition in indexes:
+                    # Leftover (possibly INVALID) index from an interrupted rebuild
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                    try:
+                        cursor.execute(definition.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1))
+                    except Exception as e:
+                        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                        print(f"Error rebuilding index {name}: {e}")
+                        raise
+                    cursor.execute("DELETE FROM dropped_indexes WHERE index_name = %s", (name,))
+            finally:
+                conn.autocommit = False
+    
+    def restore_indexes(self):
+        """Rebuild indexes still recorded in dropped_indexes by an interrupted without_indexes()"""
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT index_name, definition FROM dropped_indexes")
+            indexes = cursor.fetchall()
+            conn.rollback()
+        if indexes:
+            self._rebuild_indexes(indexes)
+            print(f"✓ Restored {len(indexes)} indexes left dropped by an interrupted bulk load")
+    
+    def analyze(self, *tables):
+        """Refresh planner statistics for tables after a bulk load"""
+        with self.pooled_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                for table in tables:
+                    cursor.execute(f"ANALYZE {table}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error analyzing {', '.join(tables)}: {e}")
+    
+    def refresh_races_view(self):
+        """Refresh mv_races_sorted without blocking readers (no-op before migration 3)"""
+        if not self._races_view_exists():
+            return
+        with self.pooled_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                cursor.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY mv_races_sorted')
+                conn.commit()
+                self._invalidate('races')
+            except Exception as e:
+                conn.rollback()
+                print(f"Error refreshing mv_races_sorted: {e}")
     
     def insert_qualifying_result(self, race_id, driver_number, position, q1, q2, q3):
         """Insert qualifying result"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            # Ensure native Python types (avoid numpy types)
-            race_id = int(race_id) if race_id is not None else None
-            driver_number = int(driver_number) if driver_number is not None else None
-            position = int(position) if position is not None else None
-            cursor.execute("""
-                INSERT INTO qualifying_results 
-                    (race_id, driver_number, position, q1_time, q2_time, q3_time)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (race_id, driver_number, position, str(q1), str(q2), str(q3)))
-            conn.commit()
-        except Exception as e:
-            print(f"Error inserting qualifying result: {e}")
-        finally:
-            self.close()
+        # Ensure native Python types (avoid numpy types)
+        race_id = int(race_id) if race_id is not None else None
+        driver_number = int(driver_number) if driver_number is not None else None
+        position = int(position) if position is not None else None
+        self._write('qualifying_results', """
+            INSERT INTO qualifying_results 
+                (race_id, driver_number, position, q1_time, q2_time, q3_time)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (race_id, driver_number, position, str(q1), str(q2), str(q3)), 'qualifying result')
     
     def insert_race_result(self, race_id, driver_number, position, points, grid_position, status, fastest_lap):
         """Insert race result"""
-        conn = self.connect()
-        cursor = conn.cursor()
+        # Ensure native Python types (avoid numpy types)
+        race_id = int(race_id) if race_id is not None else None
+        driver_number = int(driver_number) if driver_number is not None else None
+        position = int(position) if position is not None else None
+        points = float(points) if points is not None else None
+        grid_position = int(grid_position) if grid_position is not None else None
+        self._write('race_results', """
+            INSERT INTO race_results 
+                (race_id, driver_number, position, points, grid_position, status, fastest_lap_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (race_id, driver_number, position, points, grid_position, status, str(fastest_lap)), 'race result')
+    
+    def insert_qualifying_results(self, rows):
+        """Bulk insert qualifying results in a single multi-row statement
+        
+        Args:
+            rows: Sequence of (race_id, driver_number, position, q1, q2, q3)
+        """
+        self._execute_values('qualifying_results', INSERT_QUALIFYING_RESULTS_SQL,
+                             _qualifying_rows(rows), 'qualifying results')
+    
+    def insert_race_results(self, rows):
+        """Bulk insert race results in a single multi-row statement
+        
+        Args:
+            rows: Sequence of (race_id, driver_number, position, points,
+                grid_position, status, fastest_lap)
+        """
+        self._execute_values('race_results', INSERT_RACE_RESULTS_SQL,
+                             _race_result_rows(rows), 'race results')
+    
+    def insert_season_results(self, quali_rows, race_rows):
+        """Bulk insert a season's qualifying and race results in one transaction
+        
+        Args:
+            quali_rows: Rows as for insert_qualifying_results
+            race_rows: Rows as for insert_race_results
+        
+        Returns:
+            True if both tables were written, False if the season was rolled back
+        """
+        batches = [
+            ('qualifying_results', QUALIFYING_RESULT_COLUMNS, INSERT_QUALIFYING_RESULTS_SQL,
+             _qualifying_rows(quali_rows)),
+            ('race_results', RACE_RESULT_COLUMNS, INSERT_RACE_RESULTS_SQL,
+             _race_result_rows(race_rows)),
+        ]
+        batches = [batch for batch in batches if batch[3]]
+        if not batches:
+            return True
         try:
-            # Ensure native Python types (avoid numpy types)
-            race_id = int(race_id) if race_id is not None else None
-            driver_number = int(driver_number) if driver_number is not None else None
-            position = int(position) if position is not None else None
-            points = float(points) if points is not None else None
-            grid_position = int(grid_position) if grid_position is not None else None
-            cursor.execute("""
-                INSERT INTO race_results 
-                    (race_id, driver_number, position, points, grid_position, status, fastest_lap_time)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (race_id, driver_number, position, points, grid_position, status, str(fastest_lap)))
-            conn.commit()
+            with self._write_connection(*(batch[0] for batch in batches)) as conn:
+                cursor = conn.cursor()
+                for table, columns, sql, rows in batches:
+                    # COPY skips per-row parsing; small batches are cheaper as one INSERT
+                    if len(rows) >= COPY_MIN_ROWS:
+                        _copy_rows(cursor, table, columns, rows)
+                    else:
+                        psycopg2.extras.execute_values(cursor, sql, rows, page_size=WRITE_BATCH_SIZE)
+            return True
         except Exception as e:
-            print(f"Error inserting race result: {e}")
-        finally:
-            self.close()
+            print(f"Error inserting season results: {e}")
+            return False
     
     def insert_prediction(self, race_id, session_type, driver_number, predicted_position, 
                           confidence, model_type, features, predicted_time=None, 
                           top10_probability=None, shap_values=None):
         """Insert prediction result"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO predictions 
-                    (race_id, session_type, driver_number, predicted_position, predicted_time,
-                     confidence, top10_probability, model_type, prediction_date, features_json, shap_values_json)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                race_id, session_type, driver_number, predicted_position, predicted_time,
-                confidence, top10_probability, model_type, datetime.now().isoformat(),
-                json.dumps(features), json.dumps(shap_values) if shap_values else None
-            ))
-            conn.commit()
-        except Exception as e:
-            print(f"Error inserting prediction: {e}")
-        finally:
-            self.close()
+        self._write('predictions', """
+            INSERT INTO predictions 
+                (race_id, session_type, driver_number, predicted_position, predicted_time,
+                 confidence, top10_probability, model_type, prediction_date, features_json, shap_values_json)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            race_id, session_type, driver_number, predicted_position, predicted_time,
+            confidence, top10_probability, model_type, datetime.now().isoformat(),
+            _dumps_json(features), _dumps_json(shap_values) if shap_values else None
+        ), 'prediction')
     
     def insert_aggregated_lap(self, race_id, session_type, driver_number, lap_number,
                               lap_time, sector1, sector2, sector3, compound, tyre_life,
                               track_status, is_personal_best):
-        """Insert aggregated lap data"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO aggregated_laps 
-                    (race_id, session_type, driver_number, lap_number, lap_time,
-                     sector1_time, sector2_time, sector3_time, compound, tyre_life,
-                     track_status, is_personal_best)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                race_id, session_type, driver_number, lap_number, lap_time,
-                sector1, sector2, sector3, compound, tyre_life, track_status, is_personal_best
-            ))
-            conn.commit()
-        except Exception as e:
-            print(f"Error inserting aggregated lap: {e}")
-        finally:
-            self.close()
+        """Insert aggregated lap data (times as seconds or Timedelta)"""
+        lap_time = _to_seconds(lap_time)
+        sector1 = _to_seconds(sector1)
+        sector2 = _to_seconds(sector2)
+        sector3 = _to_seconds(sector3)
+        self._write('aggregated_laps', """
+            INSERT INTO aggregated_laps 
+                (race_id, session_type, driver_number, lap_number, lap_time,
+                 sector1_time, sector2_time, sector3_time, compound, tyre_life,
+                 track_status, is_personal_best)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            race_id, session_type, driver_number, lap_number, lap_time,
+            sector1, sector2, sector3, compound, tyre_life, track_status, is_personal_best
+        ), 'aggregated lap')
+    
+    def insert_aggregated_laps(self, rows):
+        """Bulk insert aggregated laps in a single multi-row statement
+        
+        Args:
+            rows: Sequence of (race_id, session_type, driver_number, lap_number,
+                lap_time, sector1, sector2, sector3, compound, tyre_life,
+                track_status, is_personal_best); times as seconds or Timedelta
+        """
+        rows = [
+            tuple(row[:4]) + tuple(_to_seconds(t) for t in row[4:8]) + tuple(row[8:])
+            for row in rows
+        ]
+        self._execute_values('aggregated_laps', """
+            INSERT INTO aggregated_laps 
+                (race_id, session_type, driver_number, lap_number, lap_time,
+                 sector1_time, sector2_time, sector3_time, compound, tyre_life,
+                 track_status, is_personal_best)
+            VALUES %s
+        """, rows, 'aggregated laps')
     
     def insert_tyre_stat(self, race_id, session_type, driver_number, compound,
                          total_laps, avg_lap_time, degradation_slope, best_lap_time, stint_number):
-        """Insert tyre statistics"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO tyre_stats 
-                    (race_id, session_type, driver_number, compound, total_laps,
-                     avg_lap_time, degradation_slope, best_lap_time, stint_number)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                race_id, session_type, driver_number, compound, total_laps,
-                avg_lap_time, degradation_slope, best_lap_time, stint_number
-            ))
-            conn.commit()
-        except Exception as e:
-            print(f"Error inserting tyre stat: {e}")
-        finally:
-            self.close()
+        """Insert tyre statistics (times as seconds or Timedelta)"""
+        avg_lap_time = _to_seconds(avg_lap_time)
+        best_lap_time = _to_seconds(best_lap_time)
+        degradation_slope = float(degradation_slope) if degradation_slope is not None else None
+        self._write('tyre_stats', """
+            INSERT INTO tyre_stats 
+                (race_id, session_type, driver_number, compound, total_laps,
+                 avg_lap_time, degradation_slope, best_lap_time, stint_number)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (
+            race_id, session_type, driver_number, compound, total_laps,
+            avg_lap_time, degradation_slope, best_lap_time, stint_number
+        ), 'tyre stat')
+    
+    def insert_tyre_stats(self, rows):
+        """Bulk insert tyre statistics in a single multi-row statement
+        
+        Args:
+            rows: Sequence of (race_id, session_type, driver_number, compound,
+                total_laps, avg_lap_time, degradation_slope, best_lap_time,
+                stint_number); times as seconds or Timedelta
+        """
+        rows = [
+            (race_id, session_type, driver_number, compound, total_laps,
+             _to_seconds(avg_lap_time),
+             float(degradation_slope) if degradation_slope is not None else None,
+             _to_seconds(best_lap_time), stint_number)
+            for (race_id, session_type, driver_number, compound, total_laps,
+                 avg_lap_time, degradation_slope, best_lap_time, stint_number) in rows
+        ]
+        self._execute_values('tyre_stats', """
+            INSERT INTO tyre_stats 
+                (race_id, session_type, driver_number, compound, total_laps,
+                 avg_lap_time, degradation_slope, best_lap_time, stint_number)
+            VALUES %s
+        """, rows, 'tyre stats')
     
     def insert_session(self, race_id, session_type, session_date, weather_conditions=None,
                        track_temp=None, air_temp=None):
         """Insert session information (upsert on (race_id, session_type)) and return session_id"""
-        conn = self.connect()
-        cursor = conn.cursor()
         try:
-            cursor.execute("""
-                INSERT INTO sessions 
-                    (race_id, session_type, session_date, weather_conditions, track_temp, air_temp)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (race_id, session_type)
-                DO UPDATE SET
-                    session_date = EXCLUDED.session_date,
-                    weather_conditions = EXCLUDED.weather_conditions,
-                    track_temp = EXCLUDED.track_temp,
-                    air_temp = EXCLUDED.air_temp
-                RETURNING session_id
-            """, (race_id, session_type, str(session_date), weather_conditions, track_temp, air_temp))
-            session_id = cursor.fetchone()[0]
-            conn.commit()
-            return session_id
+            with self._write_connection('sessions') as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO sessions 
+                        (race_id, session_type, session_date, weather_conditions, track_temp, air_temp)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (race_id, session_type)
+                    DO UPDATE SET
+                        session_date = EXCLUDED.session_date,
+                        weather_conditions = EXCLUDED.weather_conditions,
+                        track_temp = EXCLUDED.track_temp,
+                        air_temp = EXCLUDED.air_temp
+                    RETURNING session_id
+                """, (race_id, session_type, str(session_date), weather_conditions, track_temp, air_temp))
+                return cursor.fetchone()[0]
         except Exception as e:
             print(f"Error inserting session: {e}")
             return None
-        finally:
-            self.close()
 
+    def _fetch_df(self, query, params=None):
+        """Run a query and build a DataFrame directly from the cursor rows
+        
+        Avoids pd.read_sql_query, which warns on raw DBAPI connections and
+        adds its own row-conversion pass. Each call borrows its own pooled
+        connection, so concurrent reads from several threads are safe.
+        """
+        state = self._transaction_state()
+        # Inside transaction() read on its connection so uncommitted writes are visible
+        if state is not None:
+            return self._fetch_on(state[0], query, params)
+        with self.pooled_connection() as conn:
+            try:
+                return self._fetch_on(conn, query, params)
+            finally:
+                # End the read transaction before the connection goes back to the pool
+                conn.rollback()
+    
+    @staticmethod
+    def _fetch_on(conn, query, params):
+        """Execute query on conn and build a DataFrame from all rows"""
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        columns = [desc[0] for desc in cursor.description]
+        # coerce_float turns NUMERIC aggregates (Decimal) into floats like read_sql_query
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns, coerce_float=True)
+    
+    def _cached_fetch_df(self, table, query, params=None, ttl=QUERY_CACHE_TTL):
+        """Read-through Redis cache around _fetch_df for queries on `table`"""
+        # Results read inside transaction() may be rolled back, so never cache them
+        if self.cache is None or self._transaction_state() is not None:
+            return self._fetch_df(query, params)
+        version = self.cache.get_version(f"query:{table}")
+        key = _query_cache_key(table, version, query, repr(params))
+        df = self.cache.get_dataframe(key)
+        if df is None:
+            df = self._fetch_df(query, params)
+            self.cache.cache_dataframe(key, df, ttl=ttl)
+        return df
+    
+    def _invalidate(self, table):
+        """Drop cached query results for a table after it was written
+        
+        Bumps the table's cache version instead of scanning for its keys;
+        entries under older versions are left to expire via their TTL.
+        """
+        if self.cache is not None:
+            self.cache.bump_version(f"query:{table}")
+    
     def get_all_races(self):
         """Get all races from database"""
-        conn = self.connect()
-        df = pd.read_sql_query("SELECT * FROM races ORDER BY year DESC, round_number", conn)
-        self.close()
-        return df
+        query = GET_ALL_RACES_SQL if self._races_view_exists() else GET_ALL_RACES_FALLBACK_SQL
+        return self._cached_fetch_df('races', query)
 
+    def get_race_ids(self, year):
+        """Map each event name of a season to its race_id"""
+        races = self._cached_fetch_df('races', GET_RACE_IDS_SQL, (year,))
+        return dict(zip(races['event_name'], races['race_id']))
+    
     def get_race_results(self, race_id):
         """Get results for a specific race"""
-        conn = self.connect()
-        df = pd.read_sql_query(
-            "SELECT * FROM race_results WHERE race_id = %s ORDER BY position",
-            conn, params=(race_id,)
-        )
-        self.close()
-        return df
+        return self._cached_fetch_df('race_results', GET_RACE_RESULTS_SQL, (race_id,))
     
     def get_predictions(self, race_id=None, session_type=None):
         """Get predictions, optionally filtered"""
-        conn = self.connect()
-        query = "SELECT * FROM predictions WHERE 1=1"
-        params = []
-        if race_id is not None:
-            query += " AND race_id = %s"
-            params.append(race_id)
-        if session_type is not None:
-            query += " AND session_type = %s"
-            params.append(session_type)
-        query += " ORDER BY predicted_position"
-        df = pd.read_sql_query(query, conn, params=tuple(params) if params else None)
-        self.close()
-        return df
+        query = GET_PREDICTIONS_SQL[(race_id is not None, session_type is not None)]
+        params = tuple(p for p in (race_id, session_type) if p is not None)
+        return self._cached_fetch_df('predictions', query, params or None)
     
     def execute_query(self, query, params=None):
         """Execute custom SQL query (read-only, sanitized)"""
         ql = query.strip().lower()
         if not ql.startswith('select'):
             raise ValueError("Only SELECT queries are allowed for safety")
-        conn = self.connect()
+        return self._fetch_df(query, params)
+    
+    def _db_uri(self):
+        """PostgreSQL connection URI built from db_config"""
+        cfg = self.db_config
+        return (
+            f"postgresql://{quote(str(cfg['user']), safe='')}:{quote(str(cfg['password']), safe='')}"
+            f"@{cfg['host']}:{cfg['port']}/{cfg['database']}"
+        )
+    
+    def arrow_connection(self):
+        """Open an ADBC (Arrow-native) connection to the database"""
+        # Imported here so only Arrow callers need the ADBC driver installed
+        import adbc_driver_postgresql.dbapi
+        return adbc_driver_postgresql.dbapi.connect(self._db_uri())
+    
+    def execute_query_arrow(self, query, params=None):
+        """Execute custom SQL query (read-only) and return a pyarrow.Table
+        
+        Results are fetched columnar through ADBC instead of row by row
+        through psycopg2. Note that ADBC uses PostgreSQL's native $1, $2, ...
+        placeholders rather than %s.
+        """
+        ql = query.strip().lower()
+        if not ql.startswith('select'):
+            raise ValueError("Only SELECT queries are allowed for safety")
+        with self.arrow_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetch_arrow_table()
+    
+    def iter_query(self, query, params=None, chunksize=50_000):
+        """Stream a read-only SQL query as DataFrame chunks
+        
+        Uses a server-side (named) cursor so at most `chunksize` rows are held
+        in memory at a time, instead of materializing the full result set.
+        """
+        ql = query.strip().lower()
+        if not ql.startswith('select'):
+            raise ValueError("Only SELECT queries are allowed for safety")
+        # Dedicated connection: the generator may outlive a pooled checkout
+        conn = psycopg2.connect(**self.db_config)
         try:
-            df = pd.read_sql_query(query, conn, params=params)
-            return df
+            cursor = conn.cursor(name='f1_stream')
+            cursor.itersize = chunksize
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                columns = [desc[0] for desc in cursor.description]
+                yield pd.DataFrame.from_records(rows, columns=columns)
+            cursor.close()
         finally:
-            self.close()
+            conn.close()
     
-    def get_aggregated_laps(self, race_id=None, session_type=None, driver_number=None):
-        """Get aggregated lap data with optional filters"""
-        conn = self.connect()
+    def _aggregated_laps_query(self, race_id=None, session_type=None, driver_number=None):
+        """Build the filtered aggregated_laps query and its parameters"""
         query = "SELECT * FROM aggregated_laps WHERE 1=1"
         params = []
         if race_id is not None:
@@ -494,13 +1289,21 @@ class F1Database:
             query += " AND driver_number = %s"
             params.append(driver_number)
         query += " ORDER BY lap_number"
-        df = pd.read_sql_query(query, conn, params=tuple(params) if params else None)
-        self.close()
-        return df
+        return query, tuple(params) if params else None
+    
+    def get_aggregated_laps(self, race_id=None, session_type=None, driver_number=None):
+        """Get aggregated lap data with optional filters"""
+        query, params = self._aggregated_laps_query(race_id, session_type, driver_number)
+        return self._cached_fetch_df('aggregated_laps', query, params)
+    
+    def iter_aggregated_laps(self, chunksize=50_000, race_id=None, session_type=None,
+                             driver_number=None):
+        """Stream aggregated lap data in chunks of at most `chunksize` rows"""
+        query, params = self._aggregated_laps_query(race_id, session_type, driver_number)
+        return self.iter_query(query, params, chunksize=chunksize)
     
     def get_tyre_stats(self, race_id=None, session_type=None, driver_number=None):
         """Get tyre statistics with optional filters"""
-        conn = self.connect()
         query = "SELECT * FROM tyre_stats WHERE 1=1"
         params = []
         if race_id is not None:
@@ -512,33 +1315,25 @@ class F1Database:
         if driver_number is not None:
             query += " AND driver_number = %s"
             params.append(driver_number)
-        df = pd.read_sql_query(query, conn, params=tuple(params) if params else None)
-        self.close()
-        return df
+        return self._cached_fetch_df('tyre_stats', query, tuple(params) if params else None)
     
     def get_sessions(self, race_id=None):
         """Get session information"""
-        conn = self.connect()
         if race_id is not None:
-            df = pd.read_sql_query("SELECT * FROM sessions WHERE race_id = %s", conn, params=(race_id,))
-        else:
-            df = pd.read_sql_query("SELECT * FROM sessions", conn)
-        self.close()
-        return df
+            return self._cached_fetch_df('sessions', "SELECT * FROM sessions WHERE race_id = %s", (race_id,))
+        return self._cached_fetch_df('sessions', "SELECT * FROM sessions")
     
     def get_table_names(self):
         """Get all table names in the database"""
-        conn = self.connect()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT table_name 
-            FROM information_schema.tables 
-            WHERE table_schema = 'public' 
-            ORDER BY table_name
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-        self.close()
-        return tables
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT table_name 
+                FROM information_schema.tables 
+                WHERE table_schema = 'public' 
+                ORDER BY table_name
+            """)
+            return [row[0] for row in cursor.fetchall()]
 
 
 
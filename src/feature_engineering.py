@@ -3,10 +3,93 @@ Feature Engineering Module
 Advanced feature extraction from F1 telemetry and lap data
 """
 
+from collections import namedtuple
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
-from scipy import stats
-from scipy.signal import find_peaks
+from scipy.signal import find_peaks, lfilter
+
+
+# Telemetry and lap-time kernels work in float32: speed (km/h), pedal
+# inputs (0-100) and lap times (s) carry far less than float32's ~7
+# significant digits of physical precision. Variances accumulate in float64.
+
+# Per-lap telemetry channels as contiguous float32 arrays (None if missing)
+TelemetryBuffers = namedtuple('TelemetryBuffers', 'speed throttle brake distance')
+
+TELEMETRY_CHANNELS = {
+    'speed': 'Speed',
+    'throttle': 'Throttle',
+    'brake': 'Brake',
+    'distance': 'Distance',
+}
+
+
+def to_buffers(telemetry_df):
+    """Convert a telemetry DataFrame into TelemetryBuffers in one pass"""
+    arrays = {}
+    for field, column in TELEMETRY_CHANNELS.items():
+        if column in telemetry_df.columns:
+            arrays[field] = np.ascontiguousarray(
+                telemetry_df[column].to_numpy(dtype=np.float32)
+            )
+        else:
+            arrays[field] = None
+    return TelemetryBuffers(**arrays)
+
+
+def speed_summary(speeds):
+    """Median, 95th percentile and max speed from a single partition pass"""
+    median, p95, top = np.percentile(speeds, [50, 95, 100])
+    return {'median_speed': median, 'percentile_95': p95, 'max_speed': top}
+
+
+def pedal_summary(throttle, brake):
+    """Throttle/brake variance and derived smoothness score"""
+    throttle_var = throttle.var(dtype=np.float64)
+    brake_var = brake.var(dtype=np.float64)
+    
+    # Smoothness score (lower variance = smoother driving)
+    # Normalize to 0-100 scale
+    smoothness = 100 / (1 + (throttle_var + brake_var) / 200)
+    
+    return {
+        'throttle_variance': throttle_var,
+        'brake_variance': brake_var,
+        'smoothness_score': smoothness
+    }
+
+
+def _stat_lookup(keys, stats_df, field, default):
+    """Map keys through one column of a stats frame, filling misses with default"""
+    if field not in stats_df.columns:
+        return pd.Series(default, index=keys.index)
+    return keys.map(stats_df[field]).fillna(default)
+
+
+@lru_cache(maxsize=16)
+def _form_weights(window, decay):
+    """Un-normalised form weights [1, decay, decay**2, ...] (read-only)"""
+    weights = decay ** np.arange(window, dtype=np.float64)
+    weights.setflags(write=False)
+    return weights
+
+
+def _rolling_driver_form(positions, window=5, decay=0.8):
+    """
+    Weighted form after each race for one driver's positions (oldest first)
+    
+    Element k equals calculate_driver_form for the race following the k-th
+    result: a decay-weighted mean of the last `window` positions.
+    """
+    weights = _form_weights(window, decay)
+    positions = np.asarray(positions, dtype=np.float64)
+    
+    weighted_sums = lfilter(weights, 1.0, positions)
+    weight_totals = np.cumsum(weights)[np.minimum(np.arange(len(positions)), window - 1)]
+    
+    return weighted_sums / weight_totals
 
 
 class FeatureEngineer:
@@ -31,24 +114,26 @@ class FeatureEngineer:
             return 0.0
         
         # Remove outliers (slow laps due to traffic, etc.)
-        times = np.array(lap_times)
-        life = np.array(tyre_life)
+        times = np.asarray(lap_times, dtype=np.float32)
+        life = np.asarray(tyre_life, dtype=np.float32)
         
         # Filter out laps that are > 3 std dev from mean
-        mean_time = np.mean(times)
-        std_time = np.std(times)
-        mask = np.abs(times - mean_time) <= 3 * std_time
+        mask = np.fabs(times - times.mean()) <= 3 * times.std()
         
         filtered_times = times[mask]
         filtered_life = life[mask]
         
-        if len(filtered_times) < 3:
+        if filtered_times.size < 3:
             return 0.0
         
-        # Linear regression
-        slope, intercept, r_value, p_value, std_err = stats.linregress(filtered_life, filtered_times)
+        # Closed-form least-squares slope: cov(life, time) / var(life)
+        life_dev = filtered_life - filtered_life.mean()
+        denom = np.dot(life_dev, life_dev)
+        if denom == 0:
+            return 0.0
+        slope = np.dot(life_dev, filtered_times - filtered_times.mean()) / denom
         
-        return slope
+        return float(slope)
     
     def calculate_speed_percentiles(self, speed_data):
         """
@@ -63,13 +148,7 @@ class FeatureEngineer:
         if len(speed_data) == 0:
             return {'median_speed': 0, 'percentile_95': 0, 'max_speed': 0}
         
-        speeds = np.array(speed_data)
-        
-        return {
-            'median_speed': np.median(speeds),
-            'percentile_95': np.percentile(speeds, 95),
-            'max_speed': np.max(speeds)
-        }
+        return speed_summary(np.asarray(speed_data, dtype=np.float32))
     
     def calculate_throttle_brake_variance(self, throttle_data, brake_data):
         """
@@ -85,22 +164,10 @@ class FeatureEngineer:
         if len(throttle_data) == 0 or len(brake_data) == 0:
             return {'throttle_variance': 0, 'brake_variance': 0, 'smoothness_score': 0}
         
-        throttle = np.array(throttle_data)
-        brake = np.array(brake_data)
-        
-        # Calculate variance
-        throttle_var = np.var(throttle)
-        brake_var = np.var(brake)
-        
-        # Smoothness score (lower variance = smoother driving)
-        # Normalize to 0-100 scale
-        smoothness = 100 / (1 + (throttle_var + brake_var) / 200)
-        
-        return {
-            'throttle_variance': throttle_var,
-            'brake_variance': brake_var,
-            'smoothness_score': smoothness
-        }
+        return pedal_summary(
+            np.asarray(throttle_data, dtype=np.float32),
+            np.asarray(brake_data, dtype=np.float32)
+        )
     
     def calculate_cornering_speed_deltas(self, speed_data, distance_data, brake_data):
         """
@@ -122,17 +189,18 @@ class FeatureEngineer:
                 'delta_entry_exit': 0
             }
         
-        speeds = np.array(speed_data)
-        brakes = np.array(brake_data)
+        speeds = np.asarray(speed_data, dtype=np.float32)
+        brakes = np.asarray(brake_data, dtype=np.float32)
         
         # Find corners (where braking occurs)
-        corner_indices = np.where(brakes > 10)[0]  # Brake pressure > 10%
+        corner_mask = brakes > 10  # Brake pressure > 10%
         
-        if len(corner_indices) == 0:
+        if not corner_mask.any():
+            mean_speed = speeds.mean()
             return {
-                'corner_entry_speed': np.mean(speeds),
-                'apex_speed': np.mean(speeds),
-                'corner_exit_speed': np.mean(speeds),
+                'corner_entry_speed': mean_speed,
+                'apex_speed': mean_speed,
+                'corner_exit_speed': mean_speed,
                 'delta_entry_exit': 0
             }
         
@@ -140,17 +208,20 @@ class FeatureEngineer:
         apex_indices, _ = find_peaks(-speeds, distance=5)
         
         if len(apex_indices) == 0:
+            corner_speed = speeds[corner_mask].mean()
             return {
-                'corner_entry_speed': np.mean(speeds[corner_indices]),
-                'apex_speed': np.min(speeds),
-                'corner_exit_speed': np.mean(speeds[corner_indices]),
+                'corner_entry_speed': corner_speed,
+                'apex_speed': speeds.min(),
+                'corner_exit_speed': corner_speed,
                 'delta_entry_exit': 0
             }
         
         # Calculate average speeds at different corner phases
-        corner_entry = np.mean([speeds[max(0, i-3)] for i in apex_indices])
-        apex = np.mean(speeds[apex_indices])
-        corner_exit = np.mean([speeds[min(len(speeds)-1, i+3)] for i in apex_indices])
+        entry_indices = np.maximum(apex_indices - 3, 0)
+        exit_indices = np.minimum(apex_indices + 3, len(speeds) - 1)
+        corner_entry = speeds[entry_indices].mean()
+        apex = speeds[apex_indices].mean()
+        corner_exit = speeds[exit_indices].mean()
         
         return {
             'corner_entry_speed': corner_entry,
@@ -184,13 +255,48 @@ class FeatureEngineer:
         
         # Calculate weighted average position
         positions = driver_races['position'].values
-        weights = np.array([decay ** i for i in range(len(positions))])
-        weights = weights / np.sum(weights)  # Normalize
+        weights = _form_weights(window, decay)[:len(positions)]
+        weights = weights / weights.sum()  # Normalize
         
         weighted_form = np.sum(positions * weights)
         
         return weighted_form
     
+    def batch_driver_form(self, race_results, driver_numbers, race_indices, window=5, decay=0.8):
+        """
+        Vectorized calculate_driver_form for many (driver, race) pairs
+        
+        Args:
+            race_results: DataFrame with columns [race_index, driver_number, position]
+            driver_numbers: Array of drivers to calculate form for
+            race_indices: Array of current race indices, aligned with driver_numbers
+            window: Number of previous races to consider
+            decay: Time decay factor (0-1, closer to 1 = less decay)
+        
+        Returns:
+            Array of weighted form scores aligned with the inputs
+        """
+        driver_numbers = np.asarray(driver_numbers)
+        race_indices = np.asarray(race_indices)
+        form = np.full(len(driver_numbers), 10.0)  # Neutral score
+        
+        if len(race_results) == 0:
+            return form
+        
+        history = race_results.sort_values('race_index', kind='stable')
+        for driver, results in history.groupby('driver_number', sort=False):
+            rows = np.flatnonzero(driver_numbers == driver)
+            if rows.size == 0:
+                continue
+            
+            # Form after each of the driver's races, then pick the last race before each lap's race
+            rolling_form = _rolling_driver_form(results['position'].to_numpy(), window, decay)
+            prior = np.searchsorted(results['race_index'].to_numpy(), race_indices[rows], side='left') - 1
+            has_history = prior >= 0
+            form[rows[has_history]] = rolling_form[prior[has_history]]
+        
+        return form
+    
     def create_interaction_features(self, driver_stats, team_stats, track_stats):
         """
         Create interaction features (driver×track, team×track)
@@ -254,40 +360,42 @@ class FeatureEngineer:
         
         return min(1.0, uncertainty)
     
-    def extract_telemetry_features(self, telemetry_df):
+    def extract_telemetry_features(self, telemetry):
         """
-        Extract all telemetry-derived features from a telemetry DataFrame
+        Extract all telemetry-derived features from lap telemetry
         
         Args:
-            telemetry_df: DataFrame with columns [Speed, Throttle, Brake, Distance, etc.]
+            telemetry: TelemetryBuffers, or a DataFrame with columns
+                [Speed, Throttle, Brake, Distance, etc.] (converted via to_buffers)
         
         Returns:
             dict with all telemetry features
         """
         features = {}
         
-        if telemetry_df is None or len(telemetry_df) == 0:
+        if telemetry is None:
+            return features
+        
+        buffers = telemetry if isinstance(telemetry, TelemetryBuffers) else to_buffers(telemetry)
+        
+        present = [array for array in buffers if array is not None]
+        if not present or len(present[0]) == 0:
             return features
         
         # Speed features
-        if 'Speed' in telemetry_df.columns:
-            speed_stats = self.calculate_speed_percentiles(telemetry_df['Speed'].values)
-            features.update(speed_stats)
+        if buffers.speed is not None and len(buffers.speed) > 0:
+            features.update(speed_summary(buffers.speed))
         
         # Throttle and brake features
-        if 'Throttle' in telemetry_df.columns and 'Brake' in telemetry_df.columns:
-            tb_stats = self.calculate_throttle_brake_variance(
-                telemetry_df['Throttle'].values,
-                telemetry_df['Brake'].values
-            )
-            features.update(tb_stats)
+        if buffers.throttle is not None and buffers.brake is not None:
+            features.update(pedal_summary(buffers.throttle, buffers.brake))
         
         # Cornering features
-        if all(col in telemetry_df.columns for col in ['Speed', 'Distance', 'Brake']):
+        if buffers.speed is not None and buffers.distance is not None and buffers.brake is not None:
             corner_stats = self.calculate_cornering_speed_deltas(
-                telemetry_df['Speed'].values,
-                telemetry_df['Distance'].values,
-                telemetry_df['Brake'].values
+                buffers.speed,
+                buffers.distance,
+                buffers.brake
             )
             features.update(corner_stats)
         
@@ -309,48 +417,57 @@ class FeatureEngineer:
         Returns:
             DataFrame with all features ready for training
         """
-        features_list = []
+        if len(lap_data) == 0:
+            return pd.DataFrame()
+        
+        laps = lap_data.reset_index(drop=True)
+        
+        # Base features from lap data
+        features = pd.DataFrame({
+            'driver_number': laps['driver_number'],
+            'lap_time': laps.get('lap_time', 0),
+            'sector1': laps.get('sector1_time', 0),
+            'sector2': laps.get('sector2_time', 0),
+            'sector3': laps.get('sector3_time', 0),
+            'compound': laps.get('compound', 'UNKNOWN'),
+            'tyre_life': laps.get('tyre_life', 0),
+        })
+        
+        # Telemetry features
+        if telemetry_summaries:
+            telemetry_df = pd.DataFrame.from_dict(telemetry_summaries, orient='index')
+            features = features.join(telemetry_df, on='driver_number')
+        
+        # Driver form for every lap from one pass over race_results
+        race_indices = laps.get('race_index', pd.Series(0, index=laps.index))
+        features['driver_form'] = self.batch_driver_form(
+            race_results, laps['driver_number'], race_indices
+        )
         
-        for idx, lap in lap_data.iterrows():
-            driver_num = lap['driver_number']
-            race_idx = lap.get('race_index', 0)
-            
-            # Base features from lap data
-            feature_dict = {
-                'driver_number': driver_num,
-                'lap_time': lap.get('lap_time', 0),
-                'sector1': lap.get('sector1_time', 0),
-                'sector2': lap.get('sector2_time', 0),
-                'sector3': lap.get('sector3_time', 0),
-                'compound': lap.get('compound', 'UNKNOWN'),
-                'tyre_life': lap.get('tyre_life', 0),
-            }
-            
-            # Telemetry features
-            if driver_num in telemetry_summaries:
-                feature_dict.update(telemetry_summaries[driver_num])
-            
-            # Driver form
-            driver_form = self.calculate_driver_form(race_results, driver_num, race_idx)
-            feature_dict['driver_form'] = driver_form
-            
-            # Driver stats
-            driver_data = driver_stats.get(driver_num, {})
-            feature_dict['driver_avg_position'] = driver_data.get('avg_position', 10)
-            feature_dict['driver_races'] = driver_data.get('total_races', 0)
-            
-            # Team stats
-            team_name = driver_data.get('team_name', 'Unknown')
-            team_data = team_stats.get(team_name, {})
-            feature_dict['team_avg_position'] = team_data.get('avg_position', 10)
-            
-            # Interaction features
-            interactions = self.create_interaction_features(driver_data, team_data, track_stats)
-            feature_dict.update(interactions)
-            
-            features_list.append(feature_dict)
+        # Driver stats
+        driver_df = pd.DataFrame.from_dict(driver_stats, orient='index')
+        drivers = features['driver_number']
+        driver_avg = _stat_lookup(drivers, driver_df, 'avg_position', 10)
+        features['driver_avg_position'] = driver_avg
+        features['driver_races'] = _stat_lookup(drivers, driver_df, 'total_races', 0)
+        
+        # Team stats
+        team_df = pd.DataFrame.from_dict(team_stats, orient='index')
+        team_names = _stat_lookup(drivers, driver_df, 'team_name', 'Unknown')
+        team_avg = _stat_lookup(team_names, team_df, 'avg_position', 10)
+        features['team_avg_position'] = team_avg
+        
+        # Interaction features (vectorized form of create_interaction_features)
+        features['driver_track_experience'] = (
+            _stat_lookup(drivers, driver_df, 'races_at_track', 0) * driver_avg
+        )
+        features['team_track_performance'] = (
+            _stat_lookup(team_names, team_df, 'avg_position_at_track', 10) *
+            (1 - track_stats.get('overtaking_difficulty', 0.5))
+        )
+        features['driver_team_synergy'] = (driver_avg * team_avg) ** 0.5
         
-        return pd.DataFrame(features_list)
+        return features
 
 
 def main():
@@ -0,0 +1,452 @@
+"""
+Migrate SQLite to PostgreSQL
+Copies a legacy SQLite database (f1_data.db) into the PostgreSQL schema
+"""
+
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+
+import orjson
+import pandas as pd
+import psycopg2.extras
+import pyarrow as pa
+
+# Add src to path
+sys.path.append(os.path.dirname(__file__))
+from database import F1Database
+
+
+# Parent tables first so race_id foreign keys resolve
+TABLES_TO_MIGRATE = [
+    'drivers', 'teams', 'races',
+    'qualifying_results', 'sprint_results', 'race_results',
+    'predictions', 'aggregated_laps', 'tyre_stats', 'sessions'
+]
+
+# Tables without foreign keys; migrated in a first wave, before the tables referencing races
+PARENT_TABLES = ['drivers', 'teams', 'races']
+
+# Tables migrated concurrently within a wave (each on its own connections)
+MIGRATION_WORKERS = 8
+
+# SERIAL primary key of each table; rows are upserted on it
+PRIMARY_KEYS = {
+    'drivers': 'driver_id',
+    'teams': 'team_id',
+    'races': 'race_id',
+    'qualifying_results': 'result_id',
+    'sprint_results': 'result_id',
+    'race_results': 'result_id',
+    'predictions': 'prediction_id',
+    'aggregated_laps': 'lap_id',
+    'tyre_stats': 'tyre_stat_id',
+    'sessions': 'session_id',
+}
+
+# Rows read from SQLite and COPYed per batch; bounds migration memory
+MIGRATION_BATCH_SIZE = 10_000
+
+# Columns stored as float seconds in PostgreSQL but as Timedelta strings in old SQLite files
+TIME_COLUMNS = {
+    'lap_time', 'sector1_time', 'sector2_time', 'sector3_time',
+    'avg_lap_time', 'best_lap_time'
+}
+
+# JSONB columns stored as json.dumps text (possibly with NaN / Infinity) in old SQLite files
+JSON_COLUMNS = {'features_json', 'shap_values_json'}
+
+
+_postgres_db = None
+
+
+def get_postgres_db():
+    """F1Database shared by migration and verification (one connection pool per process)"""
+    global _postgres_db
+    if _postgres_db is None:
+        _postgres_db = F1Database()
+    return _postgres_db
+
+
+def _seconds(value):
+    """Convert a legacy lap time ('0 days 00:01:31.2', '91.2' or number) to seconds"""
+    if value is None or not isinstance(value, str):
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        seconds = pd.Timedelta(value).total_seconds()
+        return None if pd.isna(seconds) else seconds
+
+
+def _jsonb_text(value):
+    """Legacy JSON text as JSONB-compatible text: NaN / Infinity become null, unparseable text NULL"""
+    if value is None or value == '':
+        return None
+    try:
+        # json.loads accepts NaN / Infinity; orjson writes them as null
+        return orjson.dumps(json.loads(value)).decode()
+    except (TypeError, ValueError):
+        return None
+
+
+def get_postgres_columns(pg_conn):
+    """Columns of every table to migrate, as {table: {column: data_type}}"""
+    cursor = pg_conn.cursor()
+    cursor.execute("""
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = ANY(%s)
+    """, (TABLES_TO_MIGRATE,))
+    columns = {table: {} for table in TABLES_TO_MIGRATE}
+    for table, column, data_type in cursor.fetchall():
+        columns[table][column] = data_type
+    return columns
+
+
+def _conflict_clause(columns, pk):
+    """ON CONFLICT action that overwrites every non-key column"""
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in columns if c != pk)
+    return f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+
+
+def _reset_sequence_sql(table, pk):
+    """Move a table's SERIAL sequence past the ids copied from SQLite"""
+    return f"""
+        SELECT setval(pg_get_serial_sequence('{table}', '{pk}'),
+                      COALESCE(MAX({pk}), 1), MAX({pk}) IS NOT NULL)
+        FROM {table}
+    """
+
+
+def migrate_table(sqlite_conn, pg_conn, table, pg_columns, use_copy=True):
+    """Copy one table into PostgreSQL, upserting on its primary key
+    
+    Args:
+        sqlite_conn: Open SQLite connection
+        pg_conn: Open PostgreSQL connection
+        table: Table to migrate
+        pg_columns: Columns of the PostgreSQL table ({column: data_type})
+        use_copy: COPY batches into a temp table and upsert once. When False,
+            each batch is sent as multi-row INSERT ... ON CONFLICT statements
+            (execute_values), for servers or poolers that reject COPY.
+    
+    Returns:
+        Number of rows migrated
+    """
+    sqlite_cursor = sqlite_conn.execute(f"SELECT * FROM {table}")
+    sqlite_columns = [desc[0] for desc in sqlite_cursor.description]
+    
+    # Columns dropped from / added to the schema since the SQLite days are skipped
+    keep = [i for i, name in enumerate(sqlite_columns) if name in pg_columns]
+    columns = [sqlite_columns[i] for i in keep]
+    time_positions = [pos for pos, name in enumerate(columns) if name in TIME_COLUMNS]
+    json_positions = [pos for pos, name in enumerate(columns) if name in JSON_COLUMNS]
+    
+    # Row projection and SQL are fixed per table, so build them once outside the batch loop
+    pick = itemgetter(*keep)
+    
+    def project(row):
+        """Column-aligned tuple of the kept columns, with times in seconds and JSONB-safe JSON"""
+        values = pick(row)
+        if not time_positions and not json_positions:
+            return values
+        values = list(values)
+        for pos in time_positions:
+            values[pos] = _seconds(values[pos])
+        for pos in json_positions:
+            values[pos] = _jsonb_text(values[pos])
+        return values
+    
+    # SQLite rows go to PostgreSQL untouched when no column is dropped or converted
+    passthrough = len(keep) == len(sqlite_columns) and not time_positions and not json_positions
+    
+    pk = PRIMARY_KEYS[table]
+    column_list = ', '.join(columns)
+    conflict = _conflict_clause(columns, pk)
+    # Explicit NULL marker: csv.writer writes None and '' alike, and COPY would load both as NULL
+    copy_sql = f"COPY tmp_{table} ({column_list}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+    insert_sql = f"INSERT INTO {table} ({column_list}) VALUES %s ON CONFLICT ({pk}) {conflict}"
+    
+    total_rows = 0
+    cursor = pg_conn.cursor()
+    try:
+        if use_copy:
+            cursor.execute(f"CREATE TEMP TABLE tmp_{table} (LIKE {table}) ON COMMIT DROP")
+        
+        # Stream SQLite in fixed-size batches; each batch is sent before the next is read
+        while True:
+            rows = sqlite_cursor.fetchmany(MIGRATION_BATCH_SIZE)
+            if not rows:
+                break
+            batch = rows if passthrough else map(project, rows)
+            if use_copy:
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows(
+                    tuple('\\N' if value is None else value for value in row) for row in batch
+                )
+                buf.seek(0)
+                cursor.copy_expert(copy_sql, buf)
+            else:
+                psycopg2.extras.execute_values(cursor, insert_sql, batch, page_size=MIGRATION_BATCH_SIZE)
+            total_rows += len(rows)
+        
+        if total_rows == 0:
+            pg_conn.rollback()
+            return 0
+        
+        if use_copy:
+            cursor.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT {column_list} FROM tmp_{table}
+                ON CONFLICT ({pk}) {conflict}
+            """)
+        
+        # Rows kept their SQLite ids, so move the SERIAL sequence past them
+        cursor.execute(_reset_sequence_sql(table, pk))
+        pg_conn.commit()
+    except Exception:
+        pg_conn.rollback()
+        raise
+    
+    return total_rows
+
+
+def migrate_table_arrow(sqlite_conn, postgres_db, table, pg_columns):
+    """Copy one table through pandas/Arrow batches and ADBC ingest, upserting on its primary key
+    
+    Alternative to migrate_table that does not go through psycopg2: SQLite
+    batches are read with pandas, converted to Arrow and bulk ingested into a
+    temporary staging table, which is then upserted with casts to the
+    target column types.
+    
+    Returns:
+        Number of rows migrated
+    """
+    pk = PRIMARY_KEYS[table]
+    staging = f"tmp_arrow_{table}"
+    columns = None
+    total_rows = 0
+    
+    with postgres_db.arrow_connection() as conn:
+        with conn.cursor() as cursor:
+            chunks = pd.read_sql(f"SELECT * FROM {table}", sqlite_conn, chunksize=MIGRATION_BATCH_SIZE)
+            for chunk in chunks:
+                if columns is None:
+                    columns = [c for c in chunk.columns if c in pg_columns]
+                    time_columns = [c for c in columns if c in TIME_COLUMNS]
+                    json_columns = [c for c in columns if c in JSON_COLUMNS]
+                chunk = chunk[columns]
+                if time_columns:
+                    chunk = chunk.assign(**{c: chunk[c].map(_seconds) for c in time_columns})
+                if json_columns:
+                    chunk = chunk.assign(**{c: chunk[c].map(_jsonb_text) for c in json_columns})
+                cursor.adbc_ingest(
+                    staging, pa.Table.from_pandas(chunk, preserve_index=False),
+                    mode='append' if total_rows else 'create', temporary=True
+                )
+                total_rows += len(chunk)
+            
+            if total_rows == 0:
+                return 0
+            
+            column_list = ', '.join(columns)
+            casts = ', '.join(f"{c}::{pg_columns[c]}" for c in columns)
+            cursor.execute(f"""
+                INSERT INTO {table} ({column_list})
+                SELECT {casts} FROM {staging}
+                ON CONFLICT ({pk}) {_conflict_clause(columns, pk)}
+            """)
+            cursor.execute(_reset_sequence_sql(table, pk))
+            cursor.execute(f"DROP TABLE {staging}")
+        conn.commit()
+    
+    return total_rows
+
+
+def migrate_sqlite_to_postgres(sqlite_db_path, postgres_db=None, use_copy=True, use_arrow=False):
+    """Migrate every table of the SQLite database into PostgreSQL
+    
+    Parent tables are migrated first, then the tables referencing them;
+    within each wave tables are copied concurrently. If a parent table
+    fails, the child tables are not attempted.
+    
+    Args:
+        sqlite_db_path: Path to the legacy SQLite file
+        postgres_db: Initialized F1Database (default: get_postgres_db())
+        use_copy: Bulk load with COPY (default) or multi-row INSERTs
+        use_arrow: Load through pandas/Arrow and ADBC ingest instead
+            (see migrate_table_arrow)
+    
+    Returns:
+        dict of table name -> rows migrated
+    
+    Raises:
+        RuntimeError: If any table failed (after the others were committed)
+    """
+    if postgres_db is None:
+        postgres_db = get_postgres_db()
+    
+    sqlite_conn = sqlite3.connect(sqlite_db_path)
+    try:
+        sqlite_tables = {
+            row[0] for row in
+            sqlite_conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+    finally:
+        sqlite_conn.close()
+    
+    with postgres_db.pooled_connection() as pg_conn:
+        pg_columns = get_postgres_columns(pg_conn)
+    
+    for table in TABLES_TO_MIGRATE:
+        if table not in sqlite_tables:
+            print(f"⚠ {table}: not in SQLite database, skipping")
+    
+    # Each worker thread opens one SQLite connection and reuses it for every
+    # table it migrates; PostgreSQL connections come from the shared pool
+    local = threading.local()
+    opened = []
+    opened_lock = threading.Lock()
+    
+    def migrate_one(table):
+        if not hasattr(local, 'sqlite_conn'):
+            # check_same_thread=False only so the main thread can close it afterwards
+            local.sqlite_conn = sqlite3.connect(sqlite_db_path, check_same_thread=False)
+            with opened_lock:
+                opened.append(local.sqlite_conn)
+        if use_arrow:
+            return migrate_table_arrow(local.sqlite_conn, postgres_db, table, pg_columns[table])
+        with postgres_db.pooled_connection() as pg_conn:
+            return migrate_table(local.sqlite_conn, pg_conn, table, pg_columns[table], use_copy)
+    
+    child_tables = [t for t in TABLES_TO_MIGRATE if t not in PARENT_TABLES]
+    migrated = {}
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as executor:
+            for wave in (PARENT_TABLES, child_tables):
+                if failed:
+                    # Child rows would only hit foreign key violations
+                    print(f"⚠ Skipping {', '.join(t for t in wave if t in sqlite_tables)}: "
+                          f"parent tables failed")
+                    break
+                futures = {
+                    executor.submit(migrate_one, table): table
+                    for table in wave if table in sqlite_tables
+                }
+                for future in as_completed(futures):
+                    table = futures[future]
+                    try:
+                        migrated[table] = future.result()
+                        print(f"✓ {table}: {migrated[table]} rows")
+                    except Exception as e:
+                        failed.append(table)
+                        print(f"Error migrating {table}: {e}")
+    finally:
+        for sqlite_conn in opened:
+            sqlite_conn.close()
+    
+    for table in migrated:
+        postgres_db._invalidate(table)
+    # Rows were loaded around F1Database's write path, so refresh the view it maintains
+    if 'races' in migrated:
+        postgres_db.refresh_races_view()
+    
+    if failed:
+        raise RuntimeError(f"Migration failed for: {', '.join(sorted(failed))}")
+    return migrated
+
+
+def _count_rows_sql(tables):
+    """Single UNION ALL query returning (tbl, n) row counts for the given tables"""
+    return " UNION ALL ".join(
+        f"SELECT '{table}' AS tbl, COUNT(*) AS n FROM {table}" for table in tables
+    )
+
+
+def verify_migration(sqlite_db_path, postgres_db=None):
+    """Compare per-table row counts between SQLite and PostgreSQL
+    
+    Counts every table with one query per database.
+    
+    Args:
+        sqlite_db_path: Path to the legacy SQLite file
+        postgres_db: F1Database to check (default: get_postgres_db())
+    
+    Returns:
+        True if every migrated table has at least as many rows in PostgreSQL
+    """
+    if postgres_db is None:
+        postgres_db = get_postgres_db()
+    
+    sqlite_conn = sqlite3.connect(sqlite_db_path)
+    try:
+        sqlite_tables = {
+            row[0] for row in
+            sqlite_conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        tables = [t for t in TABLES_TO_MIGRATE if t in sqlite_tables]
+        if not tables:
+            return True
+        sqlite_counts = dict(sqlite_conn.execute(_count_rows_sql(tables)).fetchall())
+    finally:
+        sqlite_conn.close()
+    
+    pg_df = postgres_db.execute_query(_count_rows_sql(tables))
+    pg_counts = dict(zip(pg_df['tbl'], pg_df['n']))
+    
+    ok = True
+    for table in tables:
+        sqlite_count = sqlite_counts[table]
+        pg_count = pg_counts[table]
+        status = "✓" if pg_count >= sqlite_count else "⚠"
+        ok = ok and pg_count >= sqlite_count
+        print(f"{status} {table}: SQLite {sqlite_count}, PostgreSQL {pg_count}")
+    
+    return ok
+
+
+def main():
+    """Migrate the legacy SQLite database given on the command line (default: f1_data.db)
+    
+    Pass --no-copy to load with multi-row INSERTs instead of COPY, or
+    --arrow to load through pandas/Arrow and ADBC ingest.
+    """
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    use_copy = '--no-copy' not in sys.argv[1:]
+    use_arrow = '--arrow' in sys.argv[1:]
+    sqlite_db_path = args[0] if args else 'f1_data.db'
+    
+    print("=" * 60)
+    print("F1 SQLite → PostgreSQL Migration")
+    print("=" * 60)
+    
+    if not os.path.exists(sqlite_db_path):
+        print(f"SQLite database not found: {sqlite_db_path}")
+        sys.exit(1)
+    
+    db = get_postgres_db()
+    try:
+        migrate_sqlite_to_postgres(sqlite_db_path, db, use_copy=use_copy, use_arrow=use_arrow)
+    except RuntimeError as e:
+        print(f"\n{e}")
+        sys.exit(1)
+    
+    print("\nVerifying row counts...")
+    if verify_migration(sqlite_db_path, db):
+        print("\n✓ Migration complete!")
+    else:
+        print("\n⚠ Migration finished with missing rows")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,9 @@ Extracts cached data from Redis and populates PostgreSQL database
 import fastf1
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 
 # Add src to path
 sys.path.append(os.path.dirname(__file__))
@@ -16,6 +18,26 @@ from data_fetcher import F1DataFetcher
 # Initialize fetcher with Redis
 fetcher = F1DataFetcher(use_redis=True)
 
+# FastF1 sessions downloaded concurrently by populate_results
+SESSION_LOAD_WORKERS = 6
+
+# Race results stored for a past season above which it counts as fully loaded
+# (a season is ~20 drivers x 20+ races)
+COMPLETE_SEASON_RESULTS = 400
+
+
+@lru_cache(maxsize=256)
+def _fetch_results(year, event_name, session_type):
+    """fetch_session_results, memoized so results seeded for drivers/teams are not reloaded"""
+    return fetcher.fetch_session_results(year, event_name, session_type)
+
+
+def _column(df, name, default=None):
+    """Column values as an array, or `default` repeated when the column is missing"""
+    if name in df.columns:
+        return df[name].to_numpy()
+    return [default] * len(df)
+
 
 def populate_drivers_and_teams(db, year):
     """Populate drivers and teams for a given year"""
@@ -25,37 +47,40 @@ def populate_drivers_and_teams(db, year):
         schedule = fetcher.fetch_season_schedule(year)
         
         # Get first race with qualifying to extract driver info
-        for idx, event in schedule.iterrows():
-            event_name = event['EventName']
+        for event in schedule.itertuples(index=False):
+            event_name = event.EventName
             
             try:
                 print(f"Loading {event_name} qualifying...")
-                session = fetcher.fetch_session_data(year, event_name, 'Q')
-                
                 # Extract driver information
-                results = session.results
+                results = _fetch_results(year, event_name, 'Q')
                 
                 if results is not None and len(results) > 0:
                     print(f"Found {len(results)} drivers")
                     
-                    for _, driver in results.iterrows():
-                        driver_number = driver.get('DriverNumber')
-                        abbreviation = driver.get('Abbreviation')
-                        full_name = driver.get('FullName', driver.get('BroadcastName', abbreviation))
-                        team_name = driver.get('TeamName')
-                        
+                    # Pull the columns out once and walk them in lockstep
+                    abbreviations = _column(results, 'Abbreviation')
+                    full_names = next(
+                        (results[c].to_numpy() for c in ('FullName', 'BroadcastName') if c in results.columns),
+                        abbreviations
+                    )
+                    
+                    driver_rows = []
+                    team_rows = []
+                    for driver_number, abbreviation, full_name, team_name in zip(
+                        _column(results, 'DriverNumber'), abbreviations, full_names,
+                        _column(results, 'TeamName')
+                    ):
                         if driver_number and team_name:
-                            # Insert driver
-                            db.insert_driver(
-                                driver_number=int(driver_number),
-                                abbreviation=str(abbreviation),
-                                full_name=str(full_name),
-                                team_name=str(team_name),
-                                year=year
-                            )
-                            
-                            # Insert team
-                            db.insert_team(str(team_name), year)
+                            driver_rows.append((
+                                int(driver_number), str(abbreviation), str(full_name),
+                                str(team_name), year
+                            ))
+                            team_rows.append((str(team_name), year))
+                    
+                    # One multi-row upsert per table instead of an INSERT per driver
+                    db.insert_drivers(driver_rows)
+                    db.insert_teams(team_rows)
                     
                     print(f"✓ Populated drivers and teams from {event_name}")
                     break  # Only need one race to get all drivers
@@ -69,99 +94,182 @@ def populate_drivers_and_teams(db, year):
 
 
 def populate_races(db, year):
-    """Populate race calendar for a given year"""
+    """Populate race calendar for a given year
+    
+    Returns:
+        dict of event name -> race_id for the upserted races
+    """
     print(f"\n=== Populating races for {year} ===")
     
     try:
         schedule = fetcher.fetch_season_schedule(year)
         
-        for idx, event in schedule.iterrows():
-            event_name = event['EventName']
-            country = event.get('Country', 'Unknown')
-            location = event.get('Location', 'Unknown')
-            event_date = event.get('EventDate')
-            round_number = event.get('RoundNumber', idx + 1)
-            
-            race_id = db.insert_race(
-                year=year,
-                round_number=int(round_number),
-                event_name=str(event_name),
-                country=str(country),
-                location=str(location),
-                event_date=str(event_date)
-            )
-            
+        # Build the calendar column-wise instead of row by row
+        if 'RoundNumber' in schedule.columns:
+            round_numbers = schedule['RoundNumber'].astype(int).tolist()
+        else:
+            round_numbers = (schedule.index + 1).tolist()
+        race_rows = list(zip(
+            [year] * len(schedule),
+            round_numbers,
+            schedule['EventName'].astype(str).tolist(),
+            map(str, _column(schedule, 'Country', 'Unknown')),
+            map(str, _column(schedule, 'Location', 'Unknown')),
+            map(str, _column(schedule, 'EventDate')),
+        ))
+        
+        # Upsert the whole calendar in one statement; RETURNING hands back the ids
+        race_ids = db.insert_races(race_rows) or []
+        race_id_by_event = {}
+        for row, race_id in zip(race_rows, race_ids):
             if race_id:
-                print(f"✓ Added race: {event_name}")
+                race_id_by_event[row[2]] = race_id
+                print(f"✓ Added race: {row[2]}")
+        return race_id_by_event
         
     except Exception as e:
         print(f"Error populating races for {year}: {e}")
+        return {}
+
+
+def _process_event(year, event_name, race_id, cached_results=None):
+    """Load one event's qualifying and race results and build their rows
+    
+    Args:
+        cached_results: Results tables already prefetched from Redis, keyed by
+            (event_name, session_type); missing ones are fetched as usual
+    
+    Returns:
+        (qualifying_rows, race_rows) ready for the bulk insert helpers
+    """
+    cached_results = cached_results or {}
+    quali_rows = []
+    race_rows = []
+    
+    # Qualifying results
+    try:
+        print(f"Loading {event_name} qualifying results...")
+        quali_results = cached_results.get((event_name, 'Q'))
+        if quali_results is None:
+            quali_results = _fetch_results(year, event_name, 'Q')
+        
+        if quali_results is not None and len(quali_results) > 0:
+            quali_rows = [
+                (
+                    race_id,
+                    int(driver_number),
+                    int(position) if position else 0,
+                    q1, q2, q3
+                )
+                for driver_number, position, q1, q2, q3 in zip(
+                    _column(quali_results, 'DriverNumber', 0),
+                    _column(quali_results, 'Position', 0),
+                    _column(quali_results, 'Q1', ''),
+                    _column(quali_results, 'Q2', ''),
+                    _column(quali_results, 'Q3', '')
+                )
+            ]
+            print(f"  ✓ Loaded {event_name} qualifying results")
+    except Exception as e:
+        print(f"  Skipping {event_name} qualifying: {e}")
+    
+    # Race results
+    try:
+        print(f"Loading {event_name} race results...")
+        race_results = cached_results.get((event_name, 'R'))
+        if race_results is None:
+            race_results = _fetch_results(year, event_name, 'R')
+        
+        if race_results is not None and len(race_results) > 0:
+            race_rows = [
+                (
+                    race_id,
+                    int(driver_number),
+                    int(position) if position else 0,
+                    float(points),
+                    int(grid_position) if grid_position else 0,
+                    str(status),
+                    fastest_lap
+                )
+                for driver_number, position, points, grid_position, status, fastest_lap in zip(
+                    _column(race_results, 'DriverNumber', 0),
+                    _column(race_results, 'Position', 0),
+                    _column(race_results, 'Points', 0),
+                    _column(race_results, 'GridPosition', 0),
+                    _column(race_results, 'Status', 'Unknown'),
+                    _column(race_results, 'FastestLap', '')
+                )
+            ]
+            print(f"  ✓ Loaded {event_name} race results")
+    except Exception as e:
+        print(f"  Skipping {event_name} race: {e}")
+    
+    return quali_rows, race_rows
 
 
-def populate_results(db, year):
-    """Populate race and qualifying results"""
+def populate_results(db, year, race_id_by_event=None):
+    """Populate race and qualifying results
+    
+    Args:
+        race_id_by_event: Event name -> race_id as returned by populate_races;
+            looked up in the database when not given
+    """
     print(f"\n=== Populating results for {year} ===")
     
     try:
         schedule = fetcher.fetch_season_schedule(year)
         
-        for idx, event in schedule.iterrows():
-            event_name = event['EventName']
+        # Otherwise one parameterized lookup of every race_id for the season
+        if not race_id_by_event:
+            race_id_by_event = db.get_race_ids(year)
+        
+        events = []
+        for event in schedule.itertuples(index=False):
+            event_name = event.EventName
             
             # Get race_id
-            race_query = f"SELECT race_id FROM races WHERE year={year} AND event_name='{event_name}'"
-            race_result = db.execute_query(race_query)
-            
-            if len(race_result) == 0:
-                continue
-                
-            race_id = race_result.iloc[0]['race_id']
-            
-            # Qualifying results
-            try:
-                print(f"Loading {event_name} qualifying results...")
-                quali_session = fetcher.fetch_session_data(year, event_name, 'Q')
-                quali_results = quali_session.results if quali_session else None
-                
-                if quali_results is not None and len(quali_results) > 0:
-                    for _, driver in quali_results.iterrows():
-                        db.insert_qualifying_result(
-                            race_id=race_id,
-                            driver_number=int(driver.get('DriverNumber', 0)),
-                            position=int(driver.get('Position', 0)) if driver.get('Position') else 0,
-                            q1=driver.get('Q1', ''),
-                            q2=driver.get('Q2', ''),
-                            q3=driver.get('Q3', '')
-                        )
-                    print(f"  ✓ Added qualifying results")
-            except Exception as e:
-                print(f"  Skipping qualifying: {e}")
+            race_id = race_id_by_event.get(event_name)
             
-            # Race results
-            try:
-                print(f"Loading {event_name} race results...")
-                race_session = fetcher.fetch_session_data(year, event_name, 'R')
-                race_results = race_session.results if race_session else None
-                
-                if race_results is not None and len(race_results) > 0:
-                    for _, driver in race_results.iterrows():
-                        db.insert_race_result(
-                            race_id=race_id,
-                            driver_number=int(driver.get('DriverNumber', 0)),
-                            position=int(driver.get('Position', 0)) if driver.get('Position') else 0,
-                            points=float(driver.get('Points', 0)),
-                            grid_position=int(driver.get('GridPosition', 0)) if driver.get('GridPosition') else 0,
-                            status=str(driver.get('Status', 'Unknown')),
-                            fastest_lap=driver.get('FastestLap', '')
-                        )
-                    print(f"  ✓ Added race results")
-            except Exception as e:
-                print(f"  Skipping race: {e}")
+            if race_id is not None:
+                events.append((event_name, race_id))
+        
+        # Cached results arrive in one MGET; only the misses are fetched per event
+        cached_results = fetcher.prefetch_session_results(year, [event_name for event_name, _ in events])
+        
+        # Session downloads are network-bound and independent, so overlap them
+        quali_rows = []
+        race_rows = []
+        with ThreadPoolExecutor(max_workers=SESSION_LOAD_WORKERS) as executor:
+            futures = [
+                executor.submit(_process_event, year, event_name, race_id, cached_results)
+                for event_name, race_id in events
+            ]
+            for future in as_completed(futures):
+                event_quali_rows, event_race_rows = future.result()
+                quali_rows.extend(event_quali_rows)
+                race_rows.extend(event_race_rows)
+        
+        # The whole season lands (or rolls back) as one transaction
+        if db.insert_season_results(quali_rows, race_rows):
+            print(f"✓ Added {len(quali_rows)} qualifying and {len(race_rows)} race results")
     
     except Exception as e:
         print(f"Error populating results for {year}: {e}")
 
 
+def populated_years(db):
+    """Past seasons that already have a complete set of race results"""
+    done = db.execute_query("""
+        SELECT r.year
+        FROM race_results rr
+        JOIN races r ON r.race_id = rr.race_id
+        GROUP BY r.year
+        HAVING COUNT(*) > %s
+    """, (COMPLETE_SEASON_RESULTS,))
+    current_year = datetime.now().year
+    return {int(year) for year in done['year'] if year < current_year}
+
+
 def main():
     """Main function to populate database"""
     print("=" * 60)
@@ -170,11 +278,23 @@ def main():
     
     db = F1Database()
     
-    # Populate for 2023-2025
-    for year in [2023, 2024, 2025]:
-        populate_drivers_and_teams(db, year)
-        populate_races(db, year)
-        populate_results(db, year)
+    # Populate for 2023-2025, skipping finished seasons loaded by an earlier run
+    done = populated_years(db)
+    years = [year for year in [2023, 2024, 2025] if year not in done]
+    for year in sorted(done):
+        print(f"✓ {year} season already populated, skipping")
+    
+    if years:
+        # Secondary indexes are rebuilt once after the load instead of per row
+        with db.without_indexes('races', 'qualifying_results', 'race_results'):
+            for year in years:
+                # One commit per season: races, results and the race_id lookup in
+                # between share a single transaction
+                with db.transaction():
+                    populate_drivers_and_teams(db, year)
+                    race_id_by_event = populate_races(db, year)
+                    populate_results(db, year, race_id_by_event)
+        db.analyze('races', 'qualifying_results', 'race_results')
     
     print("\n" + "=" * 60)
     print("✓ Database population complete!")
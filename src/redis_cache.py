@@ -0,0 +1,198 @@
+"""
+Redis Cache Module
+Pickle-based Redis cache shared by the data fetcher and database layers
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+import redis
+
+# TTL (seconds, None = never expires) per key class, taken from the key's
+# first ':' segment when set() is called without an explicit ttl
+TTL_POLICY = {
+    'schedule': 86400,        # calendars get revised during the season
+    'session': 14 * 86400,    # completed sessions never change, but each
+                              # pickled Session is tens of MB: bound growth
+    'session_recent': 3600,   # timing data is still corrected for a few days
+    'results': None,          # small classification tables of settled sessions
+                              # (recent ones use session_recent)
+    'query': 3600,            # versioned per table, so this only bounds memory
+}
+# Marker for "no ttl given, use TTL_POLICY"
+_POLICY_TTL = object()
+
+# Connections per RedisCache; enough for the session-loading thread pools
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 32))
+
+# RedisCache instances shared within the process, keyed by connection settings
+_INSTANCES = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def make_key(prefix, *args, **kwargs):
+    """Fixed-length cache key: prefix plus a blake2b digest of the arguments' repr"""
+    digest = hashlib.blake2b(
+        repr((args, sorted(kwargs.items()))).encode(), digest_size=12
+    ).hexdigest()
+    return f"{prefix}:{digest}"
+
+
+class RedisCache:
+    """Custom cache backend for FastF1 using Redis"""
+    
+    def __init__(self, redis_host=None, redis_port=None, redis_db=None):
+        """Initialize Redis cache"""
+        # Threads wait for a free connection instead of opening extra ones;
+        # keepalive and health checks keep idle pooled connections usable
+        pool = redis.BlockingConnectionPool(
+            host=redis_host or os.getenv('REDIS_HOST', 'localhost'),
+            port=int(redis_port or os.getenv('REDIS_PORT', 6379)),
+            db=int(redis_db or os.getenv('REDIS_DB', 0)),
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            health_check_interval=30,
+            decode_responses=False  # We need bytes for pickle
+        )
+        self.redis_client = redis.Redis(connection_pool=pool)
+    
+    def get(self, key):
+        """Get cached data from Redis"""
+        try:
+            data = self.redis_client.get(key)
+            if data:
+                return pickle.loads(data)
+            return None
+        except Exception as e:
+            print(f"Redis get error: {e}")
+            return None
+    
+    @staticmethod
+    def _ttl_for(key, ttl):
+        """Explicit ttl, or the TTL_POLICY entry for the key's class"""
+        if ttl is _POLICY_TTL:
+            return TTL_POLICY.get(key.split(':', 1)[0])
+        return ttl
+    
+    def set(self, key, value, ttl=_POLICY_TTL):
+        """Set cached data in Redis (ttl defaults to the key class's TTL_POLICY)"""
+        ttl = self._ttl_for(key, ttl)
+        try:
+            # Protocol 5 writes numpy/DataFrame buffers out-of-band-capable and compact
+            serialized = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if ttl:
+                self.redis_client.setex(key, ttl, serialized)
+            else:
+                self.redis_client.set(key, serialized)
+            return True
+        except Exception as e:
+            print(f"Redis set error: {e}")
+            return False
+    
+    def cache_dataframe(self, key, df, ttl=_POLICY_TTL):
+        """Store a DataFrame as Parquet bytes (columnar, keeps dtypes)"""
+        ttl = self._ttl_for(key, ttl)
+        try:
+            buf = io.BytesIO()
+            df.to_parquet(buf, engine='pyarrow', compression='zstd')
+            if ttl:
+                self.redis_client.setex(key, ttl, buf.getvalue())
+            else:
+                self.redis_client.set(key, buf.getvalue())
+            return True
+        except Exception as e:
+            print(f"Redis set error: {e}")
+            return False
+    
+    def get_dataframe(self, key):
+        """Get a DataFrame stored with cache_dataframe"""
+        try:
+            data = self.redis_client.get(key)
+            if data:
+                return pd.read_parquet(io.BytesIO(data), engine='pyarrow')
+            return None
+        except Exception as e:
+            print(f"Redis get error: {e}")
+            return None
+    
+    def mget_dataframes(self, keys):
+        """Get several DataFrames stored with cache_dataframe in one round-trip"""
+        if not keys:
+            return []
+        try:
+            return [
+                pd.read_parquet(io.BytesIO(data), engine='pyarrow') if data else None
+                for data in self.redis_client.mget(keys)
+            ]
+        except Exception as e:
+            print(f"Redis mget error: {e}")
+            return [None] * len(keys)
+    
+    @staticmethod
+    def _version_seed():
+        """Starting value for a missing version counter: the current time in microseconds
+        
+        Counters have no TTL but can still be evicted (allkeys-lru). Restarting
+        from a clock value instead of 0 keeps a recreated counter above every
+        version used before, so entries cached under those are never served again.
+        """
+        return time.time_ns() // 1000
+    
+    def get_version(self, namespace):
+        """Current version counter of a key namespace (seeded on first use)"""
+        key = f"{namespace}:ver"
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.set(key, self._version_seed(), nx=True)
+            pipe.get(key)
+            return int(pipe.execute()[1])
+        except Exception as e:
+            print(f"Redis get error: {e}")
+            return 0
+    
+    def bump_version(self, namespace):
+        """Invalidate every key built with the namespace's current version
+        
+        O(1): stale entries are never read again and expire through their TTL.
+        """
+        key = f"{namespace}:ver"
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.set(key, self._version_seed(), nx=True)
+            pipe.incr(key)
+            return pipe.execute()[1]
+        except Exception as e:
+            print(f"Redis incr error: {e}")
+            return None
+    
+    def delete_pattern(self, pattern):
+        """Delete all keys matching a glob pattern, returns number deleted"""
+        try:
+            # UNLINK frees memory off the main thread; pipelining saves a round-trip per key
+            deleted = 0
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in self.redis_client.scan_iter(match=pattern, count=500):
+                pipe.unlink(key)
+                if len(pipe) >= 500:
+                    deleted += sum(pipe.execute())
+            deleted += sum(pipe.execute())
+            return deleted
+        except Exception as e:
+            print(f"Redis delete error: {e}")
+            return 0
+
+
+def get_cache_instance(redis_host=None, redis_port=None, redis_db=None):
+    """Process-wide RedisCache for the given settings, so callers share one client"""
+    key = (redis_host, redis_port, redis_db)
+    cache = _INSTANCES.get(key)
+    if cache is None:
+        with _INSTANCES_LOCK:
+            cache = _INSTANCES.get(key)
+            if cache is None:
+                cache = _INSTANCES[key] = RedisCache(redis_host, redis_port, redis_db)
+    return cache
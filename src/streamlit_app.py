@@ -5,18 +5,21 @@ Interactive UI to view data, predictions, and model explanations
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 import sys
-import json
-import plotly.express as px
-import plotly.graph_objects as go
+import io
+import threading
+import orjson
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from database import F1Database
 from telemetry_handler import TelemetryHandler
-from ml_models import F1PredictionModel
 
 
 # Page configuration
@@ -27,6 +30,357 @@ st.set_page_config(
 )
 
 
+@st.cache_resource
+def get_db():
+    """One F1Database per server process, shared across reruns and sessions
+    
+    Sharing is safe: every query borrows its own pooled connection and the
+    legacy connect()/close() connection is kept per thread.
+    """
+    return F1Database(initialize=False)
+
+
+@st.cache_resource
+def get_query_executor():
+    """One query thread pool per server process (the script module is re-run on
+    every interaction, so a module-level pool would be rebuilt each time).
+    Concurrent queries from all sessions add at most QUERY_WORKERS checkouts
+    to the database connection pool."""
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix='f1-dashboard-query')
+
+
+# Low-cardinality labels that are always made categorical, however few rows
+# a result has (int8 codes for filters, unique() and plot grouping)
+CATEGORICAL_COLUMNS = frozenset({'session_type', 'model_type', 'team_name', 'event_name'})
+
+
+def compact_dtypes(df):
+    """Downcast a frame for the front-end: smallest ints, float32, categoricals
+    for repetitive string columns and Arrow-backed strings for the rest
+    (smaller payloads, no object -> Arrow conversion when rendered)
+    
+    The result is rebuilt column by column, so every column is contiguous in
+    memory whatever layout the cursor rows were converted through.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        kind = values.dtype.kind
+        if kind in 'iu':
+            columns[column] = pd.to_numeric(values, downcast='integer')
+        elif kind == 'f':
+            columns[column] = values.astype(np.float32)
+        elif kind == 'O' and len(values):
+            if column in CATEGORICAL_COLUMNS or values.nunique() <= len(values) // 2:
+                columns[column] = values.astype('category')
+            elif pd.api.types.infer_dtype(values, skipna=True) == 'string':
+                columns[column] = values.astype('string[pyarrow]')
+    return pd.DataFrame({column: columns.get(column, df[column]) for column in df.columns})
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_query(sql, params=None):
+    """Cached execute_query: identical SQL and bind parameters reuse the result across reruns"""
+    return compact_dtypes(get_db().execute_query(sql, params))
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def run_query_capped(sql, params=None, max_rows=50_000):
+    """Cached query streamed from a server-side cursor in chunks, stopping after
+    `max_rows` rows instead of materializing the full result set"""
+    frames, n_rows = [], 0
+    with closing(get_db().iter_query(sql, params, chunksize=QUERY_CHUNK_ROWS)) as chunks:
+        for chunk in chunks:
+            frames.append(chunk.iloc[:max_rows - n_rows])
+            n_rows += len(frames[-1])
+            if n_rows >= max_rows:
+                break
+    if not frames:
+        return pd.DataFrame()
+    return compact_dtypes(pd.concat(frames, ignore_index=True))
+
+
+# Home page feature list, rendered as a single markdown element
+HOME_FEATURES = {
+    "🔄 Data Collection": "FastF1 API with Redis caching (2023-2025)",
+    "💾 Storage": "PostgreSQL for structured data, JSON for telemetry",
+    "🤖 Machine Learning": "Multiple ensemble models with feature importance",
+    "📊 2026 Predictions": "Race-by-race predictions for entire 2026 season",
+    "🏁 Championship Projections": "Projected driver standings based on predictions",
+    "📈 Explainability": "Feature importance and confidence scores",
+    "🌐 Offline Mode": "Works without internet after Redis caching"
+}
+HOME_FEATURES_MD = "\n\n".join(
+    f"**{feature}**: {description}" for feature, description in HOME_FEATURES.items()
+)
+
+# Max points per telemetry trace sent to the browser
+TELEMETRY_PLOT_POINTS = 2000
+# Max markers in the stored predictions scatter
+PREDICTION_PLOT_POINTS = 2000
+# Rows in each feature importance table (the bar chart shows every feature)
+FEATURE_TABLE_ROWS = 15
+
+# Plotly modebar/interaction settings shared by every chart
+PLOTLY_CONFIG = {'responsive': True, 'scrollZoom': False}
+
+# Position labels for the predicted top 10 table
+MEDALS = ['🥇', '🥈', '🥉'] + [f"{i}." for i in range(4, 11)]
+# Confidence shown with 3 decimals by the front-end instead of preformatted strings
+CONFIDENCE_COLUMN = st.column_config.NumberColumn('Confidence', format='%.3f')
+
+# Database explorer: projected columns and a stable order for paging, per table
+# (predictions leaves out the bulky features/SHAP JSON)
+EXPLORER_TABLES = {
+    'races': ("race_id, year, round_number, event_name, country, location, event_date",
+              "year DESC, round_number"),
+    'drivers': ("driver_number, full_name, abbreviation, team_name, year",
+                "year DESC, driver_number"),
+    'teams': ("team_id, team_name, year", "year DESC, team_name"),
+    'race_results': ("result_id, race_id, driver_number, position, points, grid_position, "
+                     "status, fastest_lap_time", "result_id"),
+    'qualifying_results': ("result_id, race_id, driver_number, position, q1_time, q2_time, q3_time",
+                           "result_id"),
+    'sprint_results': ("result_id, race_id, driver_number, position, points, status", "result_id"),
+    'predictions': ("prediction_id, race_id, session_type, driver_number, predicted_position, "
+                    "predicted_time, confidence, top10_probability, model_type, prediction_date",
+                    "prediction_id"),
+}
+EXPLORER_PAGE_SIZE = 500
+
+# Model predictions page: only the displayed columns of the stored predictions
+# (display name -> SQL expression), filtered in SQL by session type and model
+# type (a NULL parameter matches everything)
+STORED_PREDICTION_COLUMNS = {
+    'driver_number': 'p.driver_number',
+    'driver_name': 'd.full_name',
+    'team_name': 'd.team_name',
+    'event_name': 'r.event_name',
+    'year': 'r.year',
+    'session_type': 'p.session_type',
+    'predicted_position': 'p.predicted_position',
+    'confidence': 'p.confidence',
+    'model_type': 'p.model_type',
+}
+STORED_PREDICTIONS_SQL = """
+    SELECT {columns}
+    FROM predictions p
+    LEFT JOIN races r ON p.race_id = r.race_id
+    LEFT JOIN drivers d ON p.driver_number = d.driver_number AND r.year = d.year
+    WHERE (%s IS NULL OR p.session_type = %s)
+      AND (%s IS NULL OR p.model_type = %s)
+    ORDER BY p.prediction_date DESC, p.predicted_position
+    """.format(columns=", ".join(
+        f"{expr} AS {name}" for name, expr in STORED_PREDICTION_COLUMNS.items()
+    ))
+PREDICTION_FILTERS_SQL = "SELECT DISTINCT session_type, model_type FROM predictions"
+# Summary metrics over the same filters, computed by the database in one scan
+PREDICTION_STATS_SQL = """
+    SELECT
+        COUNT(*) AS predictions,
+        COUNT(DISTINCT race_id) AS races,
+        COUNT(DISTINCT driver_number) AS drivers,
+        AVG(confidence) AS avg_confidence
+    FROM predictions
+    WHERE (%s IS NULL OR session_type = %s)
+      AND (%s IS NULL OR model_type = %s)
+    """
+
+# Trained model artifacts and their metadata JSON
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+
+# Row budget for the stored predictions page and the chunk size it is streamed in
+PREDICTION_DISPLAY_ROWS = 50_000
+QUERY_CHUNK_ROWS = 10_000
+
+# Large tables: fixed viewport height (the grid only lays out visible rows)
+# and rows sent to the browser per "Show more" step
+TABLE_HEIGHT = 400
+TABLE_ROW_STEP = 5000
+
+# Worker threads for overlapping independent queries, shared by every session
+QUERY_WORKERS = 4
+
+# Points for finishing positions 1-10
+POINTS_SYSTEM = {1: 25, 2: 18, 3: 15, 4: 12, 5: 10, 6: 8, 7: 6, 8: 4, 9: 2, 10: 1}
+
+
+# Prediction columns the championship standings depend on
+STANDINGS_COLUMNS = ['driver_name', 'team_name', 'predicted_position']
+
+
+def projected_standings(predictions_df):
+    """Championship table from predicted finishing positions (one groupby)"""
+    points = predictions_df['predicted_position'].map(POINTS_SYSTEM).fillna(0).astype('int16')
+    standings = (
+        predictions_df.assign(Points=points)
+        .groupby('driver_name', as_index=False, sort=False, observed=True)
+        .agg(Team=('team_name', 'first'), Points=('Points', 'sum'))
+        .rename(columns={'driver_name': 'Driver'})
+        .sort_values('Points', ascending=False, ignore_index=True)
+    )
+    standings['Position'] = range(1, len(standings) + 1)
+    return standings[['Position', 'Driver', 'Team', 'Points']]
+
+
+def show_figure(fig):
+    """Render a Plotly figure without transitions, keeping zoom/pan state across reruns"""
+    fig.update_layout(transition_duration=0, uirevision='keep')
+    fig.update_traces(marker_line_width=0, selector=dict(type='bar'))
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
+
+
+def show_table(df, key=None):
+    """Render a large frame at a fixed height with 3-decimal float columns.
+    With a key, rows are sent TABLE_ROW_STEP at a time behind a "Show more" button."""
+    column_config = {
+        column: st.column_config.NumberColumn(format='%.3f')
+        for column in df.select_dtypes(include='float').columns
+    }
+    rows = len(df) if key is None else st.session_state.get(key, TABLE_ROW_STEP)
+    st.dataframe(
+        df.head(rows), use_container_width=True, height=TABLE_HEIGHT,
+        column_config=column_config
+    )
+    if rows < len(df):
+        st.caption(f"Showing {rows:,} of {len(df):,} rows")
+        if st.button("Show more", key=f"{key}_more"):
+            st.session_state[key] = rows + TABLE_ROW_STEP
+            st.rerun()
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of a Largest-Triangle-Three-Buckets downsample of (x, y) to n_out points
+    
+    Keeps the first and last point and, from each bucket in between, the point
+    forming the largest triangle with the previous pick and the next bucket's
+    mean, which preserves the visual peaks and troughs of the trace.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 buckets over the interior points; spacing > 1 keeps them non-empty
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def list_model_files(suffixes):
+    """Sorted file names in MODEL_DIR ending with one of `suffixes` (None if the directory is missing)"""
+    if not os.path.isdir(MODEL_DIR):
+        return None
+    return sorted(f for f in os.listdir(MODEL_DIR) if f.endswith(suffixes))
+
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def load_model_metadata(file_path, mtime):
+    """Parse a model metadata JSON file with orjson; `mtime` keys the cache so retraining reloads"""
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+@st.cache_data(ttl=600, max_entries=8, show_spinner=False)
+def load_telemetry_file(file_path, mtime):
+    """Parse a telemetry JSON file with orjson; `mtime` keys the cache so edits reload"""
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+@st.cache_resource
+def get_telemetry_handler():
+    """One TelemetryHandler per server process"""
+    return TelemetryHandler()
+
+
+def dir_signature(path):
+    """(entry count, newest mtime) of a directory tree; changes when files are added, removed or edited"""
+    count, newest = 0, 0.0
+    for root, dirs, files in os.walk(path):
+        for name in dirs + files:
+            count += 1
+            newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return count, newest
+
+
+@st.cache_data(show_spinner=False)
+def telemetry_listing(signature):
+    """Telemetry summary and file list, rescanned only when `signature` changes"""
+    handler = get_telemetry_handler()
+    return handler.get_telemetry_summary(), handler.list_available_telemetry()
+
+
+def run_concurrently(*calls):
+    """Run independent zero-argument callables (e.g. cached queries) on the query pool
+    
+    Workers get the current script run context attached, so st.cache_data
+    and session state behave as they do on the script thread.
+    """
+    ctx = get_script_run_ctx()
+    
+    def call_with_ctx(call):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return call()
+    
+    return list(get_query_executor().map(call_with_ctx, calls))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def table_row_count(table):
+    """Row count of an explorer table, refreshed every 5 minutes"""
+    return int(get_db().execute_query(f"SELECT COUNT(*) AS n FROM {table}").iloc[0]['n'])
+
+
+def table_csv(table):
+    """CSV export of a whole explorer table as a binary buffer
+    
+    Rows are streamed from a server-side cursor in chunks and each chunk is
+    encoded straight into the buffer, so no second full-size str/bytes copy
+    is made here. st.download_button still reads the buffer into one bytes
+    payload when it registers the file.
+    """
+    columns, order = EXPLORER_TABLES[table]
+    buf = io.BytesIO()
+    chunks = get_db().iter_query(f"SELECT {columns} FROM {table} ORDER BY {order}", chunksize=10_000)
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(buf, index=False, header=(i == 0), mode='wb', encoding='utf-8')
+    buf.seek(0)
+    return buf
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def feature_table(features_json):
+    """Two-column Feature/Value table from a prediction's stored features JSON"""
+    features = orjson.loads(features_json)
+    return pd.DataFrame({'Feature': list(features), 'Value': list(features.values())})
+
+
+def session_standings(predictions_df):
+    """projected_standings, recomputed only when the predictions it depends on change
+    
+    Reruns that only change the selected race find the table in session_state
+    under a fingerprint of STANDINGS_COLUMNS.
+    """
+    subset = predictions_df[STANDINGS_COLUMNS]
+    signature = int(pd.util.hash_pandas_object(subset, index=False).sum())
+    cached = st.session_state.get('standings')
+    if cached is None or cached[0] != signature:
+        cached = st.session_state['standings'] = (signature, projected_standings(subset))
+    return cached[1]
+
+
 def main():
     """Main Streamlit application"""
     
@@ -73,18 +427,7 @@ def show_home():
     
     st.subheader("System Features")
     
-    features = {
-        "🔄 Data Collection": "FastF1 API with Redis caching (2023-2025)",
-        "💾 Storage": "PostgreSQL for structured data, JSON for telemetry",
-        "🤖 Machine Learning": "Multiple ensemble models with feature importance",
-        "📊 2026 Predictions": "Race-by-race predictions for entire 2026 season",
-        "🏁 Championship Projections": "Projected driver standings based on predictions",
-        "📈 Explainability": "Feature importance and confidence scores",
-        "🌐 Offline Mode": "Works without internet after Redis caching"
-    }
-    
-    for feature, description in features.items():
-        st.markdown(f"**{feature}**: {description}")
+    st.markdown(HOME_FEATURES_MD)
     
     st.markdown("---")
     
@@ -105,29 +448,30 @@ def show_drivers_teams():
     st.header("🏎️ Drivers & Teams")
     
     try:
-        db = F1Database()
-        
         # Year selector
         years_query = "SELECT DISTINCT year FROM drivers ORDER BY year DESC"
-        years_df = db.execute_query(years_query)
+        years_df = run_query(years_query)
         
         if len(years_df) > 0:
             selected_year = st.selectbox("Select Season", years_df['year'].tolist(), index=0)
             
             # Get drivers for selected year
-            drivers_query = f"""
+            drivers_query = """
             SELECT 
                 driver_number as "Car Number",
                 full_name as "Driver Name",
                 abbreviation as "Code",
                 team_name as "Constructor/Team"
             FROM drivers
-            WHERE year = {selected_year}
+            WHERE year = %s
             ORDER BY team_name, driver_number
             """
-            drivers_df = db.execute_query(drivers_query)
+            drivers_df = run_query(drivers_query, (selected_year,))
             
             if len(drivers_df) > 0:
+                # Rows arrive sorted by team, so one unsorted groupby keeps that order
+                teams = drivers_df.groupby('Constructor/Team', sort=False, observed=True)
+                
                 st.subheader(f"{selected_year} Season - Drivers & Teams")
                 
                 # Display as formatted table
@@ -142,8 +486,7 @@ def show_drivers_teams():
                 with col1:
                     st.metric("Total Drivers", len(drivers_df))
                 with col2:
-                    num_teams = drivers_df['Constructor/Team'].nunique()
-                    st.metric("Teams", num_teams)
+                    st.metric("Teams", teams.ngroups)
                 with col3:
                     st.metric("Season", selected_year)
                 
@@ -151,14 +494,15 @@ def show_drivers_teams():
                 
                 # Group by team
                 st.subheader("Drivers by Team")
-                for team in sorted(drivers_df['Constructor/Team'].unique()):
-                    team_drivers = drivers_df[drivers_df['Constructor/Team'] == team]
-                    
+                for team, team_drivers in teams:
                     with st.expander(f"🏁 {team} ({len(team_drivers)} drivers)"):
-                        for _, driver in team_drivers.iterrows():
-                            st.markdown(f"""
-                            **#{driver['Car Number']} - {driver['Driver Name']}** ({driver['Code']})
-                            """)
+                        # One markdown element per team instead of one per driver
+                        st.markdown("\n\n".join(
+                            f"**#{number} - {name}** ({code})"
+                            for number, name, code in team_drivers[
+                                ['Car Number', 'Driver Name', 'Code']
+                            ].itertuples(index=False, name=None)
+                        ))
                 
                 # Download option
                 st.markdown("---")
@@ -181,11 +525,12 @@ def show_drivers_teams():
 
 def show_2026_predictions():
     """2026 Season Predictions page with race-by-race breakdown"""
+    # Plotly is only imported by the pages that chart
+    import plotly.express as px
+    
     st.header("🏁 2026 Season Predictions")
     
     try:
-        db = F1Database()
-        
         # Get 2026 predictions
         predictions_query = """
         SELECT 
@@ -206,7 +551,7 @@ def show_2026_predictions():
         WHERE r.year = 2026
         ORDER BY r.round_number, p.predicted_position
         """
-        predictions_df = db.execute_query(predictions_query)
+        predictions_df = run_query(predictions_query)
         
         if len(predictions_df) > 0:
             # Overview stats
@@ -229,46 +574,59 @@ def show_2026_predictions():
             st.subheader("Select Race")
             race_options = predictions_df[['round_number', 'event_name', 'event_date']].drop_duplicates()
             race_options = race_options.sort_values('round_number')
+            # event name -> (round, date), so labels are dict lookups instead of frame scans
+            race_meta = {
+                event_name: (round_number, event_date)
+                for round_number, event_name, event_date in race_options.itertuples(index=False, name=None)
+            }
             
             selected_race = st.selectbox(
                 "Choose a race",
-                options=race_options['event_name'].tolist(),
-                format_func=lambda x: f"Round {race_options[race_options['event_name']==x]['round_number'].values[0]} - {x}"
+                options=list(race_meta),
+                format_func=lambda x: f"Round {race_meta[x][0]} - {x}"
             )
             
             # Filter for selected race
-            race_predictions = predictions_df[predictions_df['event_name'] == selected_race].copy()
-            race_predictions = race_predictions.sort_values('predicted_position')
+            race_predictions = predictions_df[predictions_df['event_name'] == selected_race].sort_values('predicted_position')
             
             if len(race_predictions) > 0:
                 # Race header
-                race_round = race_predictions['round_number'].iloc[0]
-                race_date = race_predictions['event_date'].iloc[0]
+                race_round, race_date = race_meta[selected_race]
                 
                 st.markdown(f"### Round {race_round}: {selected_race}")
                 st.markdown(f"**Date:** {race_date}")
                 
                 # Top 10 predictions
                 st.subheader("🏆 Predicted Top 10")
-                top10 = race_predictions.head(10).copy()
-                top10['Position'] = range(1, len(top10) + 1)
+                top10 = race_predictions.head(10)
                 
-                display_cols = ['Position', 'driver_name', 'team_name', 'confidence']
-                display_df = top10[display_cols].copy()
-                display_df.columns = ['Pos', 'Driver', 'Team', 'Confidence']
-                display_df['Confidence'] = display_df['Confidence'].apply(lambda x: f"{x:.3f}")
+                display_df = pd.DataFrame({
+                    'Pos': MEDALS[:len(top10)],
+                    'Car #': top10['driver_number'].to_numpy(),
+                    'Driver': top10['driver_name'].to_numpy(),
+                    'Team': top10['team_name'].to_numpy(),
+                    'Confidence': top10['confidence'].to_numpy(),
+                })
                 
-                st.dataframe(display_df, use_container_width=True, hide_index=True)
+                st.dataframe(
+                    display_df, use_container_width=True, hide_index=True,
+                    column_config={'Confidence': CONFIDENCE_COLUMN}
+                )
                 
                 # Full grid
                 st.markdown("---")
                 with st.expander("📊 View Full Predicted Grid"):
-                    full_grid = race_predictions.copy()
-                    full_grid['Position'] = range(1, len(full_grid) + 1)
-                    full_grid_display = full_grid[['Position', 'driver_name', 'team_name', 'driver_number', 'confidence']]
-                    full_grid_display.columns = ['Pos', 'Driver', 'Team', 'Car #', 'Confidence']
-                    full_grid_display['Confidence'] = full_grid_display['Confidence'].apply(lambda x: f"{x:.3f}")
-                    st.dataframe(full_grid_display, use_container_width=True, hide_index=True)
+                    full_grid_display = pd.DataFrame({
+                        'Pos': np.arange(1, len(race_predictions) + 1),
+                        'Driver': race_predictions['driver_name'].to_numpy(),
+                        'Team': race_predictions['team_name'].to_numpy(),
+                        'Car #': race_predictions['driver_number'].to_numpy(),
+                        'Confidence': race_predictions['confidence'].to_numpy(),
+                    })
+                    st.dataframe(
+                        full_grid_display, use_container_width=True, hide_index=True,
+                        column_config={'Confidence': CONFIDENCE_COLUMN}
+                    )
                 
                 # Visualization
                 st.markdown("---")
@@ -284,20 +642,16 @@ def show_2026_predictions():
                     labels={'driver_name': 'Driver', 'confidence': 'Confidence Score', 'team_name': 'Team'}
                 )
                 fig.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
+                show_figure(fig)
                 
                 # Feature importance (if available)
                 if 'features_json' in race_predictions.columns:
                     with st.expander("🔍 Feature Analysis"):
                         try:
                             # Parse first driver's features as example
-                            sample_features = json.loads(race_predictions.iloc[0]['features_json'])
+                            features_df = feature_table(race_predictions.iloc[0]['features_json'])
                             
                             st.markdown("**Sample Feature Values (First Predicted Driver):**")
-                            features_df = pd.DataFrame([sample_features]).T
-                            features_df.columns = ['Value']
-                            features_df['Feature'] = features_df.index
-                            features_df = features_df[['Feature', 'Value']]
                             st.dataframe(features_df, use_container_width=True, hide_index=True)
                         except:
                             st.info("Feature data not available")
@@ -306,29 +660,7 @@ def show_2026_predictions():
             st.markdown("---")
             st.subheader("🏆 Projected Championship Standings")
             
-            # Points system
-            points_system = {1: 25, 2: 18, 3: 15, 4: 12, 5: 10, 6: 8, 7: 6, 8: 4, 9: 2, 10: 1}
-            
-            # Calculate points for each driver
-            driver_points = {}
-            for _, pred in predictions_df.iterrows():
-                driver = pred['driver_name']
-                position = pred['predicted_position']
-                points = points_system.get(position, 0)
-                
-                if driver not in driver_points:
-                    driver_points[driver] = {'points': 0, 'team': pred['team_name']}
-                driver_points[driver]['points'] += points
-            
-            # Create standings dataframe
-            standings = pd.DataFrame([
-                {'Driver': k, 'Team': v['team'], 'Points': v['points']}
-                for k, v in driver_points.items()
-            ]).sort_values('Points', ascending=False)
-            
-            standings['Position'] = range(1, len(standings) + 1)
-            standings = standings[['Position', 'Driver', 'Team', 'Points']]
-            
+            standings = session_standings(predictions_df)
             st.dataframe(standings.head(10), use_container_width=True, hide_index=True)
             
         else:
@@ -350,43 +682,50 @@ def show_database_explorer():
     st.header("Database Explorer")
     
     try:
-        db = F1Database()
+        db = get_db()
         
         # Table selector
-        tables = ["races", "drivers", "teams", "race_results", 
-                  "qualifying_results", "sprint_results", "predictions"]
-        
-        selected_table = st.selectbox("Select Table", tables)
+        selected_table = st.selectbox("Select Table", list(EXPLORER_TABLES))
         
         # Execute query
         if selected_table:
             st.subheader(f"Table: {selected_table}")
             
-            # Enhanced query for drivers to show all info
-            if selected_table == "drivers":
-                query = "SELECT driver_number, full_name, abbreviation, team_name, year FROM drivers ORDER BY year DESC, driver_number"
-            else:
-                query = f"SELECT * FROM {selected_table}"
-            df = db.execute_query(query)
+            # Only one page of rows is fetched and sent to the browser; the
+            # row count and the page (as last selected) are queried concurrently
+            columns, order = EXPLORER_TABLES[selected_table]
+            page_query = f"SELECT {columns} FROM {selected_table} ORDER BY {order} LIMIT %s OFFSET %s"
+            page_key = f"explorer_page_{selected_table}"
+            page = st.session_state.get(page_key, 1)
+            total_rows, df = run_concurrently(
+                lambda: table_row_count(selected_table),
+                lambda: run_query(page_query, (EXPLORER_PAGE_SIZE, (page - 1) * EXPLORER_PAGE_SIZE)),
+            )
             
-            if len(df) > 0:
-                st.dataframe(df, use_container_width=True)
+            if total_rows > 0:
+                num_pages = (total_rows - 1) // EXPLORER_PAGE_SIZE + 1
+                if page > num_pages:
+                    # The table shrank below the remembered page
+                    page = st.session_state[page_key] = num_pages
+                    df = run_query(page_query, (EXPLORER_PAGE_SIZE, (page - 1) * EXPLORER_PAGE_SIZE))
+                st.number_input("Page", min_value=1, max_value=num_pages, key=page_key)
+                show_table(df)
                 
                 # Show statistics
                 col1, col2 = st.columns(2)
                 with col1:
-                    st.metric("Total Rows", len(df))
+                    st.metric("Total Rows", total_rows)
                 with col2:
                     st.metric("Columns", len(df.columns))
                 
-                # Download option
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Download as CSV",
-                    data=csv,
-                    file_name=f"{selected_table}.csv",
-                    mime="text/csv"
-                )
+                # Download option: the full table is only exported on request
+                if st.button("Prepare CSV export"):
+                    st.download_button(
+                        label="Download as CSV",
+                        data=table_csv(selected_table),
+                        file_name=f"{selected_table}.csv",
+                        mime="text/csv"
+                    )
             else:
                 st.info(f"No data in {selected_table} table yet")
         
@@ -413,13 +752,15 @@ def show_database_explorer():
 
 def show_telemetry_viewer():
     """Telemetry viewer page"""
+    import plotly.graph_objects as go
+    
     st.header("Telemetry Viewer")
     
     try:
-        handler = TelemetryHandler()
+        handler = get_telemetry_handler()
         
-        # Get telemetry summary
-        summary = handler.get_telemetry_summary()
+        # Get telemetry summary and file list (cached until the directory changes)
+        summary, files = telemetry_listing(dir_signature(handler.telemetry_dir))
         
         col1, col2 = st.columns(2)
         with col1:
@@ -430,9 +771,6 @@ def show_telemetry_viewer():
         
         st.markdown("---")
         
-        # List all telemetry files
-        files = handler.list_available_telemetry()
-        
         if files:
             st.subheader("Available Telemetry Files")
             
@@ -451,8 +789,7 @@ def show_telemetry_viewer():
                     file_path = os.path.join(handler.telemetry_dir, selected_file)
                     
                     try:
-                        with open(file_path, 'r') as f:
-                            data = json.load(f)
+                        data = load_telemetry_file(file_path, os.path.getmtime(file_path))
                         
                         # Show metadata
                         st.subheader("Metadata")
@@ -461,22 +798,27 @@ def show_telemetry_viewer():
                         # Show data
                         if 'telemetry' in data:
                             st.subheader("Telemetry Data")
-                            telemetry_df = pd.DataFrame(data['telemetry'])
-                            st.dataframe(telemetry_df, use_container_width=True)
+                            telemetry_df = compact_dtypes(pd.DataFrame(data['telemetry']))
+                            show_table(telemetry_df, key=f"telemetry_rows_{selected_file}")
                             
                             # Plot if numeric columns exist
-                            numeric_cols = telemetry_df.select_dtypes(include=['float64', 'int64']).columns
+                            numeric_cols = telemetry_df.select_dtypes(include='number').columns
                             if len(numeric_cols) > 0:
                                 st.subheader("Visualization")
                                 plot_col = st.selectbox("Select column to plot", numeric_cols)
                                 
-                                fig = px.line(telemetry_df, y=plot_col, title=f"{plot_col} over time")
-                                st.plotly_chart(fig, use_container_width=True)
+                                # Ship at most TELEMETRY_PLOT_POINTS points, drawn with WebGL
+                                y = telemetry_df[plot_col].to_numpy(dtype=np.float64)
+                                x = np.arange(len(y), dtype=np.float64)
+                                keep = lttb_indices(x, y, TELEMETRY_PLOT_POINTS)
+                                fig = go.Figure(go.Scattergl(x=keep, y=y[keep], mode='lines', name=plot_col))
+                                fig.update_layout(title=f"{plot_col} over time")
+                                show_figure(fig)
                         
                         elif 'laps' in data:
                             st.subheader("Lap Data")
                             laps_df = pd.DataFrame(data['laps'])
-                            st.dataframe(laps_df, use_container_width=True)
+                            show_table(laps_df, key=f"laps_rows_{selected_file}")
                     
                     except Exception as e:
                         st.error(f"Error loading file: {e}")
@@ -487,83 +829,97 @@ def show_telemetry_viewer():
         st.error(f"Error: {e}")
 
 
+@st.fragment
+def stored_predictions_panel(filters_df):
+    """Filters, summary, table and scatter of the stored predictions
+    
+    Runs as a fragment: changing a filter reruns only this panel (its cached
+    queries and its figure), not the rest of the predictions page.
+    """
+    import plotly.express as px
+    
+    # Filter options
+    col1, col2 = st.columns(2)
+    with col1:
+        session_types = sorted(filters_df['session_type'].dropna().unique())
+        selected_session = st.selectbox("Session Type", ['All'] + session_types)
+    
+    with col2:
+        model_types = sorted(filters_df['model_type'].dropna().unique())
+        selected_model = st.selectbox("Model Type", ['All'] + model_types)
+    
+    # Filter data
+    session = None if selected_session == 'All' else selected_session
+    model = None if selected_model == 'All' else selected_model
+    params = (session, session, model, model)
+    stats_df, filtered_df = run_concurrently(
+        lambda: run_query(PREDICTION_STATS_SQL, params),
+        lambda: run_query_capped(STORED_PREDICTIONS_SQL, params, PREDICTION_DISPLAY_ROWS),
+    )
+    
+    # Summary over every matching prediction, not just the rows fetched
+    stats = stats_df.iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Predictions", int(stats['predictions']))
+    with col2:
+        st.metric("Races", int(stats['races']))
+    with col3:
+        st.metric("Drivers", int(stats['drivers']))
+    with col4:
+        avg_confidence = stats['avg_confidence']
+        st.metric("Avg Confidence", "-" if pd.isna(avg_confidence) else f"{avg_confidence:.2f}")
+    
+    if len(filtered_df) >= PREDICTION_DISPLAY_ROWS:
+        st.caption(f"Showing the {PREDICTION_DISPLAY_ROWS:,} most recent predictions")
+    
+    # Display predictions (the query selects exactly the displayed columns)
+    st.dataframe(filtered_df, use_container_width=True)
+    
+    # Visualization
+    if len(filtered_df) > 0 and 'driver_name' in filtered_df.columns:
+        st.subheader("Prediction Visualization")
+        
+        # LTTB over the predictions ordered by driver number keeps the
+        # extremes of each bucket instead of truncating the frame
+        order = np.argsort(filtered_df['driver_number'].to_numpy(), kind='stable')
+        keep = order[lttb_indices(
+            filtered_df['driver_number'].to_numpy(dtype=np.float64)[order],
+            filtered_df['predicted_position'].to_numpy(dtype=np.float64)[order],
+            PREDICTION_PLOT_POINTS,
+        )]
+        if len(keep) < len(filtered_df):
+            st.caption(f"Plotting {len(keep):,} of {len(filtered_df):,} predictions")
+        
+        fig = px.scatter(
+            filtered_df.iloc[keep],
+            x='driver_number',
+            y='predicted_position',
+            size='confidence',
+            color='team_name',
+            hover_data=['driver_name'],
+            title="Predictions by Driver",
+            labels={'driver_number': 'Driver Number', 'predicted_position': 'Predicted Position'},
+            render_mode='webgl'
+        )
+        # Nearest-point hover within a small radius instead of scanning dense regions
+        fig.update_layout(hovermode='closest', hoverdistance=10)
+        show_figure(fig)
+
+
 def show_predictions():
     """Model predictions page"""
     st.header("Model Predictions")
     
     try:
-        db = F1Database()
-        
-        # Get predictions from database with driver info
-        predictions_query = """
-        SELECT 
-            p.prediction_id,
-            p.race_id,
-            r.event_name,
-            r.year,
-            p.session_type,
-            p.driver_number,
-            d.full_name as driver_name,
-            d.team_name,
-            p.predicted_position,
-            p.confidence,
-            p.model_type,
-            p.prediction_date
-        FROM predictions p
-        LEFT JOIN races r ON p.race_id = r.race_id
-        LEFT JOIN drivers d ON p.driver_number = d.driver_number AND r.year = d.year
-        ORDER BY p.prediction_date DESC, p.predicted_position
-        """
-        predictions_df = db.execute_query(predictions_query)
+        # Filter options come from a small DISTINCT query; the filters are then
+        # applied in SQL and each filter combination is cached by run_query
+        filters_df = run_query(PREDICTION_FILTERS_SQL)
         
-        if len(predictions_df) > 0:
+        if len(filters_df) > 0:
             st.subheader("Stored Predictions")
             
-            # Filter options
-            col1, col2 = st.columns(2)
-            with col1:
-                session_types = predictions_df['session_type'].unique()
-                selected_session = st.selectbox("Session Type", ['All'] + list(session_types))
-            
-            with col2:
-                model_types = predictions_df['model_type'].unique()
-                selected_model = st.selectbox("Model Type", ['All'] + list(model_types))
-            
-            # Filter data
-            filtered_df = predictions_df.copy()
-            if selected_session != 'All':
-                filtered_df = filtered_df[filtered_df['session_type'] == selected_session]
-            if selected_model != 'All':
-                filtered_df = filtered_df[filtered_df['model_type'] == selected_model]
-            
-            # Display predictions with formatted columns
-            display_cols = ['driver_number', 'driver_name', 'team_name', 'event_name', 
-                          'year', 'session_type', 'predicted_position', 'confidence', 'model_type']
-            available_cols = [col for col in display_cols if col in filtered_df.columns]
-            st.dataframe(filtered_df[available_cols], use_container_width=True)
-            
-            # Visualization
-            if len(filtered_df) > 0 and 'driver_name' in filtered_df.columns:
-                st.subheader("Prediction Visualization")
-                
-                # Create hover text with driver info
-                filtered_df['hover_text'] = (
-                    'Driver: ' + filtered_df['driver_name'].fillna('Unknown') + '<br>' +
-                    'Team: ' + filtered_df['team_name'].fillna('Unknown') + '<br>' +
-                    'Car #: ' + filtered_df['driver_number'].astype(str)
-                )
-                
-                fig = px.scatter(
-                    filtered_df,
-                    x='driver_number',
-                    y='predicted_position',
-                    size='confidence',
-                    color='team_name',
-                    hover_data=['driver_name', 'team_name', 'confidence'],
-                    title="Predictions by Driver",
-                    labels={'driver_number': 'Driver Number', 'predicted_position': 'Predicted Position'}
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            stored_predictions_panel(filters_df)
         else:
             st.info("No predictions available. Train models using the Jupyter notebook.")
         
@@ -571,10 +927,8 @@ def show_predictions():
         st.markdown("---")
         st.subheader("Available Models")
         
-        model_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
-        if os.path.exists(model_dir):
-            model_files = [f for f in os.listdir(model_dir) if f.endswith('.pkl')]
-            
+        model_files = list_model_files(('.joblib', '.pkl'))
+        if model_files is not None:
             if model_files:
                 for model_file in model_files:
                     st.text(f"✓ {model_file}")
@@ -589,24 +943,20 @@ def show_predictions():
 
 def show_feature_importance():
     """Feature importance page"""
+    import plotly.express as px
+    
     st.header("Feature Importance & Model Explainability")
     
     try:
-        model_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models')
-        
         # Check for metadata files
-        metadata_files = []
-        if os.path.exists(model_dir):
-            metadata_files = [f for f in os.listdir(model_dir) if f.endswith('_metadata.json')]
+        metadata_files = list_model_files(('_metadata.json',)) or []
         
         if metadata_files:
             selected_model = st.selectbox("Select Model", metadata_files)
             
             if selected_model:
-                metadata_path = os.path.join(model_dir, selected_model)
-                
-                with open(metadata_path, 'r') as f:
-                    metadata = json.load(f)
+                metadata_path = os.path.join(MODEL_DIR, selected_model)
+                metadata = load_model_metadata(metadata_path, os.path.getmtime(metadata_path))
                 
                 st.subheader("Model Information")
                 st.json({
@@ -625,24 +975,27 @@ def show_feature_importance():
                     for model_type, importance in feature_importance.items():
                         st.write(f"**{model_type.replace('_', ' ').title()}**")
                         
-                        # Create dataframe for plotting
-                        importance_df = pd.DataFrame(
-                            list(importance.items()),
-                            columns=['Feature', 'Importance']
-                        ).sort_values('Importance', ascending=False)
+                        # Sort once with NumPy; only the table becomes a (small) DataFrame
+                        names = np.fromiter(importance.keys(), dtype=object, count=len(importance))
+                        values = np.fromiter(importance.values(), dtype=np.float64, count=len(importance))
+                        order = np.argsort(values)[::-1]
                         
                         # Bar chart
                         fig = px.bar(
-                            importance_df,
-                            x='Importance',
-                            y='Feature',
+                            x=values[order],
+                            y=names[order],
                             orientation='h',
+                            labels={'x': 'Importance', 'y': 'Feature'},
                             title=f"Feature Importance - {model_type.replace('_', ' ').title()}"
                         )
-                        st.plotly_chart(fig, use_container_width=True)
+                        show_figure(fig)
                         
-                        # Table
-                        st.dataframe(importance_df, use_container_width=True)
+                        # Table of the top features
+                        top = order[:FEATURE_TABLE_ROWS]
+                        st.dataframe(
+                            pd.DataFrame({'Feature': names[top], 'Importance': values[top]}),
+                            use_container_width=True, hide_index=True
+                        )
                         st.markdown("---")
                 else:
                     st.info("No feature importance data available in metadata")